@@ -5,16 +5,18 @@
 """Core of the SQLStatement functionality. SQLEntityFactory handles parsing and 
 analysis of the sql statement string."""
 
+import time
+from collections import namedtuple
 from io import UnsupportedOperation
-from typing import List
-from sqlparse import parse
+from typing import Dict, List, Tuple
+from sqlparse import parse, lexer
 from sqlparse.sql import Statement, Token, Parenthesis, Comparison, Where
 import sqlparse.tokens as TType
 
 from .sqlentities import (SQLDatabase, SQLTable, SQLColumn, SQLConstraint, SQLConstraintUnique, 
     SQLConstraintNotNull, SQLConstraintPrimaryKey, SQLAnd, SQLOr)
 from .sqlactions import SQLDDLAction, SQLDMLAction
-from . import sqlparseutils
+from . import sqlparseutils, sqlvalues
 
 
 actionmap = {
@@ -22,6 +24,75 @@ actionmap = {
     "Comparison": SQLDMLAction.UPDATE
 }
 
+SQLParseOptions = namedtuple('SQLParseOptions', 'typed schema arrays fields budget',
+    defaults=(False, None, False, None, None))
+SQLParseOptions.__doc__ = """Options of SQLEntityFactory.create_entity.
+
+    typed: values of INSERT, UPDATE and WHERE converted to python types instead of strings
+    schema: SQLTable from CREATE TABLE (or dict of column name and type) declaring column types
+    arrays: with typed, values of multi-row INSERT columns as NumPy arrays instead of lists
+    fields: projection of entity fields to extract, f.i. {"name", "action"}, None for all.
+        Fields not requested are None in the result. Projection of name and action only
+        recognizes the statement by its leading keywords, so it returns entity also for
+        statements not supported by the full parse, f.i. INSERT INTO ... SELECT.
+    budget: SQLParseBudget limiting the cost of parsing the statement
+    """
+
+# SQLParseOptions extended by time.perf_counter() value after which SQLBudgetError
+# is raised, set from budget.maxseconds by create_entity only
+_SQLDeadlineOptions = namedtuple('_SQLDeadlineOptions', SQLParseOptions._fields + ('deadline',))
+
+HEADERFIELDS = {"name", "action"}
+# statement prefix lexed for the header of statements exceeding the budget
+HEADERBYTES = 4096
+
+class SQLBudgetError(Exception):
+
+    """Raised when the statement exceeds SQLParseBudget. limit is the name of the
+    exceeded budget (f.i. "maxtokens"), kind the statement kind as key of SQLHeader
+    (None if not recognized) and value the measured size, count, depth or seconds."""
+
+    def __init__(self, limit: str, value, kind: str = None):
+        super().__init__(limit, value, kind)
+        self.limit = limit
+        self.value = value
+        self.kind = kind
+
+    def __str__(self):
+        return f"Statement {self.kind or 'UNKNOWN'} exceeds {self.limit}: {self.value}"
+
+class SQLParseBudget:
+
+    """Per statement limits of SQLEntityFactory.create_entity, None disables the limit.
+
+    maxbytes: size of the statement in UTF-8 bytes
+    maxtokens: number of non-whitespace tokens
+    maxwheredepth: nesting of parentheses in WHERE clause
+    maxseconds: wall clock time of parsing and analysis
+    degrade: return header-only entity (name and action) instead of raising SQLBudgetError
+
+    Bytes, tokens and depth are checked by lexing without grouping before the statement
+    is parsed, so they bound the cost of sqlparse. Time is checked after parsing and
+    between analysis steps. hits counts exceeded budgets per (statement kind, limit).
+
+    Usage:
+    budget = SQLParseBudget(maxbytes=65536, maxtokens=10_000, maxseconds=0.1, degrade=True)
+    entity: SQLEntity = SQLEntityFactory.create_entity("<SQL statement string>", budget=budget)
+    """
+
+    def __init__(self, maxbytes: int = None, maxtokens: int = None, maxwheredepth: int = None,
+            maxseconds: float = None, degrade: bool = False):
+        self.maxbytes = maxbytes
+        self.maxtokens = maxtokens
+        self.maxwheredepth = maxwheredepth
+        self.maxseconds = maxseconds
+        self.degrade = degrade
+        self.hits: Dict[Tuple[str, str], int] = {}
+
+    def hit(self, kind: str, limit: str):
+        """Counts exceeded limit of the statement kind."""
+        self.hits[(kind, limit)] = self.hits.get((kind, limit), 0) + 1
+
 class SQLEntityFactory:
 
     """Factory creating structure of SQL entities as metadata based on analysis
@@ -29,6 +100,9 @@ class SQLEntityFactory:
 
     Usage:
     entity: SQLEntity = SQLEntityFactory.create_entity("<SQL statement string>")
+    entity: SQLEntity = SQLEntityFactory.create_entity("<SQL statement string>", typed=True)
+    entity: SQLEntity = SQLEntityFactory.create_entity("<SQL statement string>", fields={"name", "action"})
+    entity: SQLEntity = SQLEntityFactory.create_entity("<SQL statement string>", budget=SQLParseBudget(...))
 
     The output is either SQLDatabase or SQLTable. Please see doc string in module sqlentities
     for more details about the structure.
@@ -48,18 +122,189 @@ class SQLEntityFactory:
         return funcname
 
     @classmethod
-    def create_entity(cls, sql: str):
+    def create_entity(cls, sql: str, **options):
         """Creates SQLDatabase or SQLTable by analysis of provided SQL string.
         Please see doc string in module sqlentities
-        for more details about the structure."""
+        for more details about the structure and SQLParseOptions for options."""
+        budget: SQLParseBudget = options.get("budget")
+        if budget is None:
+            return cls.__create_entity(sql, options)
+
+        try:
+            cls.__check_budget(sql, budget)
+            deadline = time.perf_counter() + budget.maxseconds if budget.maxseconds is not None else None
+            return cls.__create_entity(sql, options, deadline)
+        except SQLBudgetError as error:
+            return cls.__budget_exceeded(sql, error, options)
+
+    @classmethod
+    def __create_entity(cls, sql: str, options: dict, deadline: float = None):
+
+        fields = options.get("fields")
+        if fields is not None and set(fields) <= HEADERFIELDS:
+            entity = cls.__create_header(sql)
+            if entity is not None:
+                return cls.__project(entity, SQLParseOptions(**options))
+
         statement: Statement = parse(sql)[0]
+
+        return cls.__create_entity_from_statement(statement, options, deadline)
+
+    @classmethod
+    def create_entity_from_statement(cls, statement: Statement, **options):
+        """Creates SQLDatabase or SQLTable from already parsed sqlparse.sql.Statement.
+        Used when the caller splits a script into statements by itself.
+        A budget in options is checked against the statement text as in create_entity."""
+        budget: SQLParseBudget = options.get("budget")
+        if budget is None:
+            return cls.__create_entity_from_statement(statement, options)
+
+        sql = str(statement)
+        try:
+            cls.__check_budget(sql, budget)
+            deadline = time.perf_counter() + budget.maxseconds if budget.maxseconds is not None else None
+            return cls.__create_entity_from_statement(statement, options, deadline)
+        except SQLBudgetError as error:
+            return cls.__budget_exceeded(sql, error, options)
+
+    @classmethod
+    def __create_entity_from_statement(cls, statement: Statement, options: dict, deadline: float = None):
+
         keywords = list(map(lambda token: token.value, 
                 filter(lambda token: token.is_keyword, statement.tokens)
             )
         )
         funcname = cls.__normalize_funcname("".join(keywords).replace(' ', '').upper())
+        parseoptions = SQLParseOptions(**options)
+        if deadline is not None:
+            parseoptions = _SQLDeadlineOptions(*parseoptions, deadline=deadline)
+        cls.__check_deadline(parseoptions)
+
+        entity = SQLProcessor[funcname](statement, parseoptions)
+        # name as in header projection, processors take f.i. the only column of SELECT for the table
+        _, name = cls.__getheader(str(statement)[:HEADERBYTES])
+        if name is not None and name != entity.name:
+            entity = entity._replace(name=name)
+
+        return cls.__project(entity, parseoptions)
+
+    @classmethod
+    def __isrequested(cls, field: str, options: SQLParseOptions):
+
+        return options.fields is None or field in options.fields
+
+    @classmethod
+    def __project(cls, entity, options: SQLParseOptions):
+        """Sets fields of the entity not requested by options.fields to None."""
+        if options.fields is None:
+            return entity
+
+        unknown = set(options.fields) - set(SQLTable._fields)
+        if unknown:
+            raise ValueError(f"Unknown entity fields: {sorted(unknown)}")
+
+        return entity._replace(**{field: None for field in entity._fields if field not in options.fields})
+
+    @classmethod
+    def __check_budget(cls, sql: str, budget: SQLParseBudget):
+        """Raises SQLBudgetError if sql exceeds size, token or WHERE depth budget.
+        Tokens are lexed without grouping and lexing stops at the first exceeded limit."""
+        if budget.maxbytes is not None and len(sql) * 4 > budget.maxbytes:
+            size = len(sql.encode())
+            if size > budget.maxbytes:
+                raise SQLBudgetError("maxbytes", size)
+
+        if budget.maxtokens is None and budget.maxwheredepth is None:
+            return
+
+        tokens = 0
+        depth = 0
+        wheredepth = None
+
+        for ttype, value in lexer.tokenize(sql):
+            if ttype in TType.Whitespace:
+                continue
+
+            tokens = tokens + 1
+            if budget.maxtokens is not None and tokens > budget.maxtokens:
+                raise SQLBudgetError("maxtokens", tokens)
+
+            if ttype in TType.Punctuation and value == "(":
+                depth = depth + 1
+                if (budget.maxwheredepth is not None and wheredepth is not None
+                        and depth - wheredepth > budget.maxwheredepth):
+                    raise SQLBudgetError("maxwheredepth", depth - wheredepth)
+            elif ttype in TType.Punctuation and value == ")":
+                depth = depth - 1
+                if wheredepth is not None and depth < wheredepth:
+                    # end of subquery the WHERE belongs to
+                    wheredepth = None
+            elif ttype in TType.Keyword and wheredepth is None and value.upper() == "WHERE":
+                wheredepth = depth
+
+    @classmethod
+    def __check_deadline(cls, options: SQLParseOptions):
 
-        return SQLProcessor[funcname](statement)
+        if isinstance(options, _SQLDeadlineOptions):
+            now = time.perf_counter()
+            if now > options.deadline:
+                raise SQLBudgetError("maxseconds", round(now - options.deadline + options.budget.maxseconds, 6))
+
+    @classmethod
+    def __budget_exceeded(cls, sql: str, error: SQLBudgetError, options: dict):
+        """Counts the exceeded budget and returns header-only entity if the budget degrades
+        and the header is recognized, raises the error otherwise."""
+        budget: SQLParseBudget = options["budget"]
+        funcname, name = cls.__getheader(sql[:HEADERBYTES])
+        error.kind = funcname if funcname in SQLHeader else None
+        budget.hit(error.kind, error.limit)
+
+        if not budget.degrade or error.kind is None or name is None:
+            raise error
+
+        entity = cls.__create_header(sql[:HEADERBYTES])
+        return cls.__project(entity, SQLParseOptions(fields=options.get("fields")))
+
+    @classmethod
+    def __getheader(cls, sql: str):
+        """Returns statement kind as key of SQLHeader and database or table name. The sql
+        string is lexed without grouping and lexing stops after the table identifier
+        except for ALTER TABLE, where the keywords following the name decide the kind."""
+        keywords: List[str] = []
+        name = None
+        depth = 0
+
+        for ttype, value in lexer.tokenize(sql):
+            if ttype in TType.Punctuation:
+                depth = depth + {"(": 1, ")": -1}.get(value, 0)
+            elif depth > 0 or ttype in TType.Whitespace or ttype in TType.Comment:
+                continue
+            elif ttype in TType.Keyword:
+                keywords.append(value.replace(' ', '').upper())
+            elif ttype == TType.Name and name is None and "".join(keywords) in SQLHeaderPrefix:
+                name = value
+                if "".join(keywords) != "ALTERTABLE":
+                    break
+
+        funcname = "".join(keywords)
+        if funcname.startswith("ALTERTABLE"):
+            funcname = cls.__normalize_funcname(funcname)
+
+        return (funcname, name)
+
+    @classmethod
+    def __create_header(cls, sql: str):
+        """Creates SQLDatabase or SQLTable with name and action only, see __getheader.
+        Returns None if the statement is not recognized, full parse is used then."""
+        funcname, name = cls.__getheader(sql)
+        if name is None or funcname not in SQLHeader:
+            return None
+
+        entitytype, action = SQLHeader[funcname]
+        if entitytype is SQLDatabase:
+            return SQLDatabase(name=name, action=action)
+
+        return SQLTable(name=name, action=action, columns=None, where=None)
 
     @classmethod
     def __getnamesfrom(cls, func, sql: Statement):
@@ -104,16 +349,25 @@ class SQLEntityFactory:
         return None
 
     @classmethod
-    def __mapwherecondition(cls, andortoken: Token):
+    def __getwherevalue(cls, columnname: str, token: Token, options: SQLParseOptions):
 
-        token: Token = sqlparseutils.getnexttoken(andortoken)
+        if options.typed and sqlvalues.isliteral(token):
+            datatype, *_ = sqlvalues.getdatatypes(options.schema, [columnname])
+            return sqlvalues.convert_value(token, datatype)
+
+        return str(token.value).strip("'")
+
+    @classmethod
+    def __mapwherecondition(cls, andortoken: Token, token: Token, options: SQLParseOptions):
+
+        cls.__check_deadline(options)
         if isinstance(token, (Comparison)):
             condition=[SQLColumn(name=token.left.value,
                 action=cls.__getwhereconditionoperator(token),
-                type=None, size=None, constraints=None, value=str(token.right.value).strip("'"))
+                type=None, size=None, constraints=None, value=cls.__getwherevalue(token.left.value, token.right, options))
             ]
         elif isinstance(token, (Parenthesis)):
-            condition=cls.__getfilterconditions(token.tokens)
+            condition=cls.__getfilterconditions(token.tokens, options)
 
         match andortoken.normalized:
             case "WHERE":
@@ -128,13 +382,11 @@ class SQLEntityFactory:
                 return (None, None)
 
     @classmethod
-    def __getfilterconditions(cls, tokens: List[Token]):
+    def __getfilterconditions(cls, tokens: List[Token], options: SQLParseOptions):
 
-        return list(
-            map(cls.__mapwherecondition,
-                list(filter(sqlparseutils.isandor, tokens))
-            )
-        )
+        tokens = list(tokens)
+        return [cls.__mapwherecondition(token, sqlparseutils.getnexttokenafter(tokens, idx), options)
+            for idx, token in enumerate(tokens) if sqlparseutils.isandor(token)]
 
     @classmethod
     def __getactionfrom(cls, func, sql: Statement):        
@@ -146,32 +398,24 @@ class SQLEntityFactory:
         )
 
     @classmethod
-    def __getwhere(cls, sql: Statement):
+    def __getwhere(cls, sql: Statement, options: SQLParseOptions):
 
         wheretokens: List[Token] = list(filter(lambda token: isinstance(token, (Where)), sql.tokens))
         if wheretokens:
-            return cls.__getfilterconditions(wheretokens[0])
+            return cls.__getfilterconditions(wheretokens[0], options)
 
         return None
 
     @classmethod
-    def __map_constraints(cls, colname: str, sql: Statement):
-
+    def __map_constraints(cls, sql: Statement):
+        """Returns dict of column name and list of its constraints. Constraint belongs
+        to the nearest column name preceding it, tokens are scanned once."""
         tokens: List = list(sql.flatten())
+        constraints: Dict[str, List] = {}
+        colname = None
 
-        def isconstraint(token: Token):
-            if token.normalized in ["PRIMARY", "NOT NULL", "UNIQUE"]:
-                idx = tokens.index(token)
-                subtokens = tokens[:idx-1]
-                tkn: Token
-
-                for tkn in reversed(subtokens):
-                    if sqlparseutils.iscolumnname(tkn):
-                        break
-
-                return tkn.value == colname
-
-            return False       
+        if not any(token.normalized in ["PRIMARY", "NOT NULL", "UNIQUE"] for token in tokens):
+            return constraints
 
         def mapconstraint(token: Token):
             match token.normalized:
@@ -184,25 +428,37 @@ class SQLEntityFactory:
                 case _:
                     raise Exception("Unsupported constraint")
 
-        constraints = list(map(mapconstraint, filter(isconstraint, tokens)))
+        for idx, token in enumerate(tokens):
+            # column name is searched before the token preceding the constraint
+            if idx >= 2 and sqlparseutils.iscolumnname(tokens[idx - 2]):
+                colname = tokens[idx - 2].value
+            if token.normalized in ["PRIMARY", "NOT NULL", "UNIQUE"] and colname is not None:
+                constraints.setdefault(colname, []).append(mapconstraint(token))
+
         return constraints
 
     @classmethod
-    def create_sqldatabase(cls, sql: Statement):
+    def create_sqldatabase(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
 
         dbname, *_ = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
         return SQLDatabase(name=dbname, action=SQLDDLAction.CREATE)
 
     @classmethod
-    def drop_sqldatabase(cls, sql: Statement):
+    def drop_sqldatabase(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
 
         dbname, *_ = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
         return SQLDatabase(name=dbname, action=SQLDDLAction.DROP)
 
     @classmethod
-    def __map_sqltable(cls, sql: Statement, tableaction: SQLDDLAction, columnaction: SQLDDLAction):
+    def __map_sqltable(cls, sql: Statement, tableaction: SQLDDLAction, columnaction: SQLDDLAction,
+            options: SQLParseOptions):
         """Extracts and maps the sql data to the SQLStatement data structure"""
         tablename, *_ = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
+        where = cls.__getwhere(sql, options) if cls.__isrequested("where", options) else None
+
+        if not cls.__isrequested("columns", options):
+            return SQLTable(name=tablename, action=tableaction, columns=None, where=where)
+
         columnnames = cls.__getnamesfrom(sqlparseutils.iscolumnname, sql)
 
         types = cls.__gettypesfrom(sqlparseutils.iscolumntype, sql)
@@ -210,48 +466,48 @@ class SQLEntityFactory:
             types = [(None, None)] * len(columnnames)
 
         zipped = list(zip(columnnames, types))
+        cls.__check_deadline(options)
+        constraints = cls.__map_constraints(sql)
 
         columns = list(map(
                 lambda column: SQLColumn(name=column[0], action=columnaction, type=column[1][0], 
-                    size=column[1][1], constraints=cls.__map_constraints(column[0], sql)),
+                    size=column[1][1], constraints=list(constraints.get(column[0], []))),
                 zipped
             )
         )
 
-        where = cls.__getwhere(sql)
-
         return SQLTable(name=tablename, action=tableaction, columns=columns, where=where)
 
     @classmethod
-    def create_sqltable(cls, sql: Statement):
+    def create_sqltable(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the CREATE TABLE sql statement."""
-        return cls.__map_sqltable(sql, SQLDDLAction.CREATE, SQLDDLAction.CREATE)
+        return cls.__map_sqltable(sql, SQLDDLAction.CREATE, SQLDDLAction.CREATE, options)
 
     @classmethod
-    def drop_sqltable(cls, sql: Statement):
+    def drop_sqltable(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the DROP TABLE sql statement."""
         tablename, *_ = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
 
         return SQLTable(name=tablename, action=SQLDDLAction.DROP, columns=[]) 
 
     @classmethod
-    def alter_sqltableaddcolumn(cls, sql: Statement):
+    def alter_sqltableaddcolumn(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE ADD COLUMN sql statement."""
-        return cls.__map_sqltable(sql, SQLDDLAction.ALTER, SQLDDLAction.ADDCOLUMN)
+        return cls.__map_sqltable(sql, SQLDDLAction.ALTER, SQLDDLAction.ADDCOLUMN, options)
 
     @classmethod
-    def alter_sqltabledropcolumn(cls, sql: Statement):
+    def alter_sqltabledropcolumn(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE DROP COLUMN sql statement."""
-        return cls.__map_sqltable(sql, SQLDDLAction.ALTER, SQLDDLAction.DROPCOLUMN)
+        return cls.__map_sqltable(sql, SQLDDLAction.ALTER, SQLDDLAction.DROPCOLUMN, options)
 
 
     @classmethod
-    def alter_sqltablemodifycolumn(cls, sql: Statement):
+    def alter_sqltablemodifycolumn(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE MODIFY COLUMN sql statement."""
-        return cls.__map_sqltable(sql, SQLDDLAction.ALTER, SQLDDLAction.MODIFYCOLUMN)
+        return cls.__map_sqltable(sql, SQLDDLAction.ALTER, SQLDDLAction.MODIFYCOLUMN, options)
 
     @classmethod
-    def alter_sqltablemodifynotnull(cls, sql: Statement):
+    def alter_sqltablemodifynotnull(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE MODIFY NOT NULL sql statement."""
         tablename, *_ = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
         columnnames = cls.__getnamesfrom(sqlparseutils.iscolumnname, sql)
@@ -283,7 +539,8 @@ class SQLEntityFactory:
         )
 
     @classmethod
-    def alter_sqltableaddconstraint(cls, sql: Statement, constrainttype: type):
+    def alter_sqltableaddconstraint(cls, sql: Statement, constrainttype: type,
+            options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE ADD CONSTRAINT sql statement."""
         tablename, constraintname = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
         columnnames = cls.__getnamesfrom(sqlparseutils.iscolumnname, sql)
@@ -293,17 +550,17 @@ class SQLEntityFactory:
         return SQLTable(name=tablename, action=SQLDDLAction.ADDCONSTRAINT, columns=columns)
 
     @classmethod
-    def alter_sqltableaddconstraintunique(cls, sql: Statement):
+    def alter_sqltableaddconstraintunique(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE ADD CONSTRAINT UNIQUE sql statement."""
-        return cls.alter_sqltableaddconstraint(sql, SQLConstraintUnique)
+        return cls.alter_sqltableaddconstraint(sql, SQLConstraintUnique, options)
 
     @classmethod
-    def alter_sqltableaddconstraintprimarykey(cls, sql: Statement):
+    def alter_sqltableaddconstraintprimarykey(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE ADD CONSTRAINT PRIMARY KEY sql statement."""
-        return cls.alter_sqltableaddconstraint(sql, SQLConstraintPrimaryKey)
+        return cls.alter_sqltableaddconstraint(sql, SQLConstraintPrimaryKey, options)
 
     @classmethod
-    def alter_sqltabledropconstraint(cls, sql: Statement):
+    def alter_sqltabledropconstraint(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the ALTER TABLE DROP CONSTRAINT sql statement."""
         tablename, constraintname = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
         columns = cls.__map_sqltableconstraint(['*'],
@@ -314,12 +571,48 @@ class SQLEntityFactory:
         return SQLTable(name=tablename, action=SQLDDLAction.DROPCONSTRAINT, columns=columns)
 
     @classmethod
-    def __map_sqldata(cls, sql: Statement, tableaction: SQLDMLAction):
+    def __gettypedvaluesfrom(cls, func, sql: Statement, columnnames: List[str], 
+            tableaction: SQLDMLAction, options: SQLParseOptions):
+        """Converts values to python types column by column. Multi-row INSERT
+        returns list (or NumPy array) of values for every column."""
+        tokens: List[Token] = list(filter(func, sql.flatten()))
+
+        rows = 1
+        if tableaction == SQLDMLAction.INSERT:
+            # every row of VALUES is a separate IdentifierList
+            rows = max(len(set(map(lambda token: id(token.parent), tokens))), 1)
+
+        width = len(columnnames) if columnnames else len(tokens) // rows
+        datatypes = sqlvalues.getdatatypes(options.schema, (columnnames or [None] * width)[:width])
+        values = sqlvalues.convert_columns(tokens, width, datatypes)
+
+        if rows == 1:
+            # columns without value token, f.i. single value INSERT or UPDATE SET a=b
+            return [column[0] for column in values if column]
+
+        if options.arrays:
+            return list(map(sqlvalues.toarray, values))
+
+        return values
+
+    @classmethod
+    def __map_sqldata(cls, sql: Statement, tableaction: SQLDMLAction, options: SQLParseOptions):
 
         tablename, *_ = cls.__getnamesfrom(sqlparseutils.is_db_or_tablename, sql)
+        where = cls.__getwhere(sql, options) if cls.__isrequested("where", options) else None
+
+        if not cls.__isrequested("columns", options):
+            return SQLTable(name=tablename, action=tableaction, columns=None, where=where)
+
         columnnames = cls.__getnamesfrom(sqlparseutils.iscolumnname, sql)
-        data = cls.__getvaluesfrom(sqlparseutils.isdata, sql)
         dataactions = cls.__getactionfrom(sqlparseutils.isdata, sql)
+        cls.__check_deadline(options)
+
+        if options.typed:
+            data = cls.__gettypedvaluesfrom(sqlparseutils.isdata, sql, columnnames, tableaction, options)
+        else:
+            data = list(map(lambda value: str(value).strip("'"),
+                cls.__getvaluesfrom(sqlparseutils.isdata, sql)))
 
         if not columnnames:
             columnnames = [None] * len(data)        
@@ -328,34 +621,32 @@ class SQLEntityFactory:
 
         columns = list(map(
                 lambda column: SQLColumn(name=column[0], action=column[2], type=None,
-                    size=None, value=str(column[1]).strip("'"), constraints=[]),
+                    size=None, value=column[1], constraints=[]),
                 zipped
             )
         )
 
-        where = cls.__getwhere(sql)
-
         return SQLTable(name=tablename, action=tableaction, columns=columns, where=where)
 
     @classmethod
-    def insert_into_sqltable(cls, sql: Statement):
+    def insert_into_sqltable(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the INSERT INTO sql statement."""
-        return cls.__map_sqldata(sql, SQLDMLAction.INSERT)
+        return cls.__map_sqldata(sql, SQLDMLAction.INSERT, options)
 
     @classmethod
-    def update_sqltable(cls, sql: Statement):
+    def update_sqltable(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the UPDATE sql statement."""
-        return cls.__map_sqldata(sql, SQLDMLAction.UPDATE)
+        return cls.__map_sqldata(sql, SQLDMLAction.UPDATE, options)
 
     @classmethod
-    def selectfrom_sqltable(cls, sql: Statement):
+    def selectfrom_sqltable(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the SELECT FROM sql statement."""
-        return cls.__map_sqltable(sql, SQLDMLAction.SELECT, SQLDMLAction.SELECT)
+        return cls.__map_sqltable(sql, SQLDMLAction.SELECT, SQLDMLAction.SELECT, options)
 
     @classmethod
-    def deletefrom_sqltable(cls, sql: Statement):
+    def deletefrom_sqltable(cls, sql: Statement, options: SQLParseOptions = SQLParseOptions()):
         """Analyzes the DELETE FROM sql statement."""
-        return cls.__map_sqltable(sql, SQLDMLAction.DELETE, SQLDMLAction.DELETE)
+        return cls.__map_sqltable(sql, SQLDMLAction.DELETE, SQLDMLAction.DELETE, options)
 
 
 SQLProcessor = {
@@ -376,3 +667,24 @@ SQLProcessor = {
     "SELECTFROM": SQLEntityFactory.selectfrom_sqltable,
     "DELETEFROM": SQLEntityFactory.deletefrom_sqltable
 }
+
+SQLHeader = {
+    "CREATEDATABASE": (SQLDatabase, SQLDDLAction.CREATE),
+    "DROPDATABASE": (SQLDatabase, SQLDDLAction.DROP),
+    "CREATETABLE": (SQLTable, SQLDDLAction.CREATE),
+    "ALTERTABLEMODIFYCOLUMN": (SQLTable, SQLDDLAction.ALTER),
+    "ALTERTABLEMODIFYNOTNULL": (SQLTable, SQLDDLAction.ADDCONSTRAINT),
+    "ALTERTABLEADD": (SQLTable, SQLDDLAction.ALTER),
+    "ALTERTABLEADDCONSTRAINTUNIQUE": (SQLTable, SQLDDLAction.ADDCONSTRAINT),
+    "ALTERTABLEADDCONSTRAINTPRIMARYKEY": (SQLTable, SQLDDLAction.ADDCONSTRAINT),
+    "ALTERTABLEDROPCONSTRAINT": (SQLTable, SQLDDLAction.DROPCONSTRAINT),
+    "ALTERTABLEDROPCOLUMN": (SQLTable, SQLDDLAction.ALTER),
+    "DROPTABLE": (SQLTable, SQLDDLAction.DROP),
+    "INSERTINTO": (SQLTable, SQLDMLAction.INSERT),
+    "UPDATE": (SQLTable, SQLDMLAction.UPDATE),
+    "SELECTFROM": (SQLTable, SQLDMLAction.SELECT),
+    "DELETEFROM": (SQLTable, SQLDMLAction.DELETE)
+}
+
+# keywords preceding the database or table name in the header of the statement
+SQLHeaderPrefix = {funcname for funcname in SQLHeader if not funcname.startswith("ALTERTABLE")} | {"ALTERTABLE"}
@@ -0,0 +1,213 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Index advisor aggregating WHERE predicates of parsed sql statements.
+
+SQLIndexAdvisor consumes a stream of SQLTable entities in a single pass. Columns
+filtered together in one AND group of a WHERE clause are counted as candidate
+composite index, schema built from CREATE TABLE and ALTER TABLE entities removes
+candidates already served by PRIMARY KEY or UNIQUE constraints.
+
+Usage:
+advisor = SQLIndexAdvisor()
+advisor.consume_sql(open("queries.log"))
+candidates: List[SQLIndexCandidate] = advisor.recommend(limit=10)
+"""
+
+from collections import namedtuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .sql import SQLEntityFactory
+from .sqlentities import SQLTable, SQLColumn, SQLConstraintUnique, SQLConstraintPrimaryKey, SQLOr
+from .sqlactions import SQLDDLAction, SQLDMLAction
+
+
+SQLIndexCandidate = namedtuple('SQLIndexCandidate', 'table columns count benefit')
+SQLIndexCandidate.__doc__ = """Candidate index of a table.
+
+    columns: equality columns ordered by frequency, followed by LIKE prefix column if any
+    count: number of statements served by the index (lower bound, see SQLIndexAdvisor)
+    benefit: estimated benefit as count weighted by the number of indexed columns
+    """
+
+# key of candidate is (table, equality columns, LIKE prefix column or None)
+SQLPredicateKey = Tuple[str, FrozenSet[str], Optional[str]]
+
+DMLACTIONS = (SQLDMLAction.SELECT, SQLDMLAction.UPDATE, SQLDMLAction.DELETE)
+LIKEBENEFIT = 0.5
+
+
+def getconjunctions(filters: List):
+    """Returns list of AND groups of the where tree, every group as dict of column name
+    and SQLDMLAction. AND binds stronger than OR, so every SQLOr starts a new group.
+    Parentheses with OR inside contribute only columns filtered in all of their groups."""
+    groups: List[Dict[str, SQLDMLAction]] = [{}]
+
+    for item in filters or []:
+        if isinstance(item, SQLOr) and groups[-1]:
+            groups.append({})
+
+        condition = item.filter
+        if len(condition) == 1 and isinstance(condition[0], SQLColumn):
+            column: SQLColumn = condition[0]
+            if column.action == SQLDMLAction.WHERELIKE and str(column.value).startswith("%"):
+                continue
+            groups[-1][column.name.lower()] = column.action
+        else:
+            nested = getconjunctions(condition)
+            common = set.intersection(*map(lambda group: set(group.items()), nested)) if nested else set()
+            groups[-1].update(common)
+
+    return [group for group in groups if group]
+
+
+class SQLIndexAdvisor:
+
+    """Single pass aggregation of WHERE predicates into ranked candidate indexes.
+
+    Memory is bounded by maxcandidates: distinct predicate sets are counted with
+    Misra-Gries heavy hitters summary, so counts of reported candidates are lower
+    bounds off by at most (number of consumed predicate sets / maxcandidates).
+    Schema keeps only column sets of PRIMARY KEY and UNIQUE constraints per table.
+    Column frequencies ordering the columns of a candidate are summed from the counted
+    predicate sets, so they are lower bounds too.
+    """
+
+    def __init__(self, maxcandidates: int = 10_000):
+        self.maxcandidates = maxcandidates
+        self.statements = 0
+        self.errors = 0
+        self._counts: Dict[SQLPredicateKey, int] = {}
+        self._indexes: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+
+    def consume_sql(self, statements: Iterable[str]):
+        """Parses and consumes sql statement strings. Only the header is parsed first,
+        DML statements are then parsed without columns, DDL statements fully.
+        Statements which can not be parsed are counted in errors."""
+        for sql in statements:
+            try:
+                header = SQLEntityFactory.create_entity(sql, fields={"name", "action"})
+                if header.action in DMLACTIONS:
+                    entity = SQLEntityFactory.create_entity(sql, fields={"action", "where"})
+                    entity = entity._replace(name=header.name)
+                elif isinstance(header, SQLTable) and header.action != SQLDMLAction.INSERT:
+                    entity = SQLEntityFactory.create_entity(sql)
+                else:
+                    continue
+            except Exception:
+                self.errors = self.errors + 1
+                continue
+
+            self.consume(entity)
+
+    def consume(self, entity):
+        """Consumes SQLTable entity. DML entities add their where predicates,
+        DDL entities update the schema of existing indexes."""
+        if not isinstance(entity, SQLTable):
+            return
+
+        self.statements = self.statements + 1
+        if entity.action in DMLACTIONS:
+            self.__add_predicates(entity)
+        else:
+            self.__update_schema(entity)
+
+    def __add_predicates(self, entity: SQLTable):
+
+        table = entity.name.lower()
+        for group in getconjunctions(entity.where):
+            equal = frozenset(name for name, action in group.items() if action == SQLDMLAction.WHEREEQUAL)
+            like = sorted(name for name, action in group.items() if action == SQLDMLAction.WHERELIKE)
+            self.__count((table, equal, like[0] if like else None))
+
+    def __count(self, key: SQLPredicateKey):
+
+        if key in self._counts or len(self._counts) < self.maxcandidates:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            return
+
+        # Misra-Gries: no room for a new key, decrement all counters instead
+        self._counts = {other: count - 1 for other, count in self._counts.items() if count > 1}
+
+    def __update_schema(self, entity: SQLTable):
+
+        table = entity.name.lower()
+        indexes = self._indexes.setdefault(table, {})
+
+        match entity.action:
+            case SQLDDLAction.DROP:
+                self._indexes.pop(table, None)
+            case SQLDDLAction.CREATE:
+                indexes.clear()
+                self.__add_constraints(entity, indexes)
+            case SQLDDLAction.DROPCONSTRAINT:
+                for column in entity.columns or []:
+                    for constraint in column.constraints or []:
+                        indexes.pop(constraint.name.lower(), None)
+            case _:
+                self.__add_constraints(entity, indexes)
+
+    def __add_constraints(self, entity: SQLTable, indexes: Dict[str, Tuple[str, ...]]):
+
+        named: Dict[str, List[str]] = {}
+        for column in entity.columns or []:
+            for constraint in column.constraints or []:
+                if not isinstance(constraint, (SQLConstraintUnique, SQLConstraintPrimaryKey)):
+                    continue
+                if entity.action == SQLDDLAction.ADDCONSTRAINT:
+                    # ALTER TABLE ADD CONSTRAINT lists all columns of one composite constraint
+                    named.setdefault(constraint.name.lower(), []).append(column.name.lower())
+                else:
+                    named[f"{column.name.lower()}_{constraint.name.lower()}"] = [column.name.lower()]
+
+        indexes.update({name: tuple(columns) for name, columns in named.items()})
+
+    def __getcolumnfrequency(self):
+
+        frequency: Dict[Tuple[str, str], int] = {}
+        for (table, equal, _), count in self._counts.items():
+            for name in equal:
+                frequency[(table, name)] = frequency.get((table, name), 0) + count
+
+        return frequency
+
+    def __iscovered(self, table: str, columns: Tuple[str, ...]):
+
+        for index in self._indexes.get(table, {}).values():
+            if len(index) >= len(columns) and set(index[:len(columns)]) == set(columns):
+                return True
+
+        return False
+
+    def recommend(self, limit: Optional[int] = None):
+        """Returns list of SQLIndexCandidate ranked by estimated benefit. Candidates
+        served by existing constraints are skipped. Candidate whose columns are
+        the leading columns of a wider candidate is merged into the wider one."""
+        candidates: List[SQLIndexCandidate] = []
+        frequency = self.__getcolumnfrequency()
+
+        for (table, equal, like), count in self._counts.items():
+            columns = tuple(sorted(equal, key=lambda name: (-frequency.get((table, name), 0), name)))
+            if like is not None:
+                columns = columns + (like,)
+            if not columns or self.__iscovered(table, columns):
+                continue
+
+            candidates.append(SQLIndexCandidate(table=table, columns=columns, count=count,
+                benefit=count * (len(equal) + (LIKEBENEFIT if like is not None else 0))))
+
+        merged: Dict[str, List[SQLIndexCandidate]] = {}
+        for candidate in sorted(candidates, key=lambda c: (-len(c.columns), -c.benefit, c.columns)):
+            tablecandidates = merged.setdefault(candidate.table, [])
+            for idx, wider in enumerate(tablecandidates):
+                if set(wider.columns[:len(candidate.columns)]) == set(candidate.columns):
+                    tablecandidates[idx] = wider._replace(count=wider.count + candidate.count,
+                        benefit=wider.benefit + candidate.benefit)
+                    break
+            else:
+                tablecandidates.append(candidate)
+
+        ranked = sorted((candidate for tablecandidates in merged.values() for candidate in tablecandidates),
+            key=lambda c: (-c.benefit, c.table, c.columns))
+        return ranked[:limit] if limit is not None else ranked
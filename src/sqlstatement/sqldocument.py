@@ -0,0 +1,256 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Incremental analysis of SQL scripts. SQLDocument keeps a parsed script and
+applies text edits by re-parsing only the statements touched by the edit.
+
+Usage:
+document = SQLDocument("<SQL script string>")
+change: SQLDocumentChange = document.edit(offset, length, "<new text>")
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+from typing import List
+from sqlparse import parse
+from sqlparse.sql import Statement, Token
+import sqlparse.tokens as TType
+
+from .sql import SQLEntityFactory
+
+SQLDocumentStatement = namedtuple('SQLDocumentStatement', 'text entity error unclosed')
+SQLDocumentChange = namedtuple('SQLDocumentChange', 'index removed added')
+
+# texts closing quotes, dollar quotes ($$ or $tag$) and block comments
+CLOSERS = ("'", '"', "`", "$", "*/")
+
+
+def splitstatements(text: str):
+    """Returns list of sqlparse.sql.Statement covering the whole text.
+    Trailing whitespaces dropped by sqlparse are kept as an extra statement."""
+    statements = list(parse(text))
+    parsedlength = sum(map(lambda statement: len(str(statement)), statements))
+
+    if parsedlength < len(text):
+        statements.append(Statement([Token(TType.Whitespace, text[parsedlength:])]))
+
+    return statements
+
+def getclosers(statement: Statement):
+    """Returns set of texts closing unclosed quotes and block comments of sqlparse.sql.Statement.
+    Unclosed quote is lexed as error, dollar quote $$ or $tag$ as error $ (closed by
+    the next $), block comment as / operator followed by *.
+    Such quote or comment can be closed by text following the statement."""
+    tokens = list(statement.flatten())
+    closers = {token.value for token in tokens if token.ttype in TType.Error}
+
+    if any(map(lambda pair: pair[0].ttype in TType.Operator and pair[0].value == "/"
+            and pair[1].value.startswith("*"), zip(tokens, tokens[1:]))):
+        closers.add("*/")
+
+    return closers
+
+def isunclosed(statement: Statement):
+    """Returns true if sqlparse.sql.Statement contains unclosed quote or block comment."""
+    return bool(getclosers(statement))
+
+def isclosedafter(statement: Statement, text: str, offset: int):
+    """Returns true if unclosed quote of sqlparse.sql.Statement can be closed by text from offset."""
+    return any(map(lambda closer: text.find(closer, offset) >= 0, getclosers(statement)))
+
+def isempty(statement: Statement):
+    """Returns true if sqlparse.sql.Statement contains only whitespaces and comments."""
+    return all(map(lambda token: token.is_whitespace or token.ttype in TType.Comment,
+        statement.flatten()))
+
+
+class SQLDocument:
+
+    """SQL script split into statements with SQL entity created for each of them.
+
+    Every statement is kept as SQLDocumentStatement with its text, the entity created
+    by SQLEntityFactory, the error raised while creating it and the flag of unclosed
+    quote or block comment. Statements containing only whitespaces or comments have
+    both entity and error set to None.
+
+    Method edit() replaces a part of the script text and re-parses only the statements
+    overlapping the edited range. Entities of all other statements are reused.
+    """
+
+    def __init__(self, text: str = ""):
+        self._text = text
+        self._statements: List[SQLDocumentStatement] = self.__parse_statements(text, [])
+        # start offsets from index _shiftindex on are stored without _shift, edit shifts
+        # only the offsets between it and the previous edit instead of all following ones
+        self._starts: List[int] = self.__getstarts(self._statements, 0)
+        self._shiftindex = len(self._starts)
+        self._shift = 0
+
+    @property
+    def text(self):
+        """Current text of the script."""
+        return self._text
+
+    @property
+    def statements(self):
+        """List of SQLDocumentStatement in order of the script."""
+        return list(self._statements)
+
+    @property
+    def entities(self):
+        """List of SQLDatabase or SQLTable entities in order of the script.
+        Statements without entity are skipped."""
+        return [statement.entity for statement in self._statements if statement.entity is not None]
+
+    def statement_at(self, offset: int):
+        """Returns index of the statement containing character at offset."""
+        if self._shiftindex < len(self._starts) and offset >= self.__start(self._shiftindex):
+            return bisect_right(self._starts, offset - self._shift, self._shiftindex) - 1
+
+        return max(bisect_right(self._starts, offset, 0, self._shiftindex) - 1, 0)
+
+    def edit(self, offset: int, length: int, text: str):
+        """Replaces length characters at offset by text and re-parses affected statements.
+        Returns SQLDocumentChange with the index of the first re-parsed statement and
+        the lists of entities removed from and added to the document."""
+        if offset < 0 or length < 0 or offset + length > len(self._text):
+            raise ValueError(f"Edit range {offset}:{offset + length} out of document bounds.")
+
+        newtext = self._text[:offset] + text + self._text[offset + length:]
+        delta = len(text) - length
+
+        # edit at the very start of a statement can change the end of the previous one
+        first = self.statement_at(offset - 1 if offset > 0 else 0)
+        last = self.statement_at(offset + length)
+        # inserted quote or end of comment can close the one left open by any previous statement
+        edited = newtext[max(offset - 1, 0):offset + len(text) + 1]
+        if any(map(lambda closer: closer in edited, CLOSERS)):
+            first = min([first] + [idx for idx, statement in enumerate(self._statements[:first])
+                if statement.unclosed])
+
+        regionstart = self.__start(first) if self._statements else 0
+        parsed, last = self.__parse_region(newtext, regionstart, offset + len(text), delta, last)
+
+        oldstatements = self._statements[first:last + 1]
+        newstatements = self.__parse_statements(parsed, oldstatements)
+
+        self._text = newtext
+        self.__moveshift(last + 1)
+        self._statements[first:last + 1] = newstatements
+        self._starts[first:last + 1] = self.__getstarts(newstatements, regionstart)
+        self._shiftindex = first + len(newstatements)
+        self._shift = self._shift + delta
+
+        return self.__getchange(first, oldstatements, newstatements)
+
+    def __parse_region(self, newtext: str, regionstart: int, editend: int, delta: int, last: int):
+        """Returns statements parsed from regionstart of newtext up to the first statement
+        boundary after the edit shared with the previous parse, and index of the last
+        replaced statement. Region grows by doubling the number of following statements,
+        region with quote closed by the following text is parsed to the end of the text at once."""
+        count = 1
+        while True:
+            end = min(last + count, len(self._statements) - 1)
+            regionend = len(newtext) if end <= last or end == len(self._statements) - 1 \
+                else self.__getend(end) + delta
+            parsed = splitstatements(newtext[regionstart:regionend])
+
+            synced = self.__sync(parsed, newtext, regionstart, regionend, editend, delta)
+            if synced is not None:
+                return synced
+            if regionend == len(newtext):
+                return parsed, len(self._statements) - 1
+
+            closed = any(map(lambda statement: isclosedafter(statement, newtext, regionend), parsed))
+            count = len(self._statements) if closed else count * 2
+
+    def __sync(self, parsed: List[Statement], newtext: str, regionstart: int, regionend: int,
+            editend: int, delta: int):
+        """Returns statements parsed before the first boundary after the edit which is
+        a statement boundary of the previous parse too, text following it is unchanged
+        and so are the statements. Unclosed quote closed by text following the region
+        makes no boundary after it certain."""
+        start = regionstart
+        for idx, statement in enumerate(parsed):
+            if idx > 0 and start >= editend:
+                index = self.statement_at(start - delta)
+                if self.__start(index) == start - delta:
+                    return parsed[:idx], index - 1
+
+            if isclosedafter(statement, newtext, regionend):
+                return None
+            start = start + len(str(statement))
+
+        return None
+
+    def __start(self, index: int):
+
+        return self._starts[index] + (self._shift if index >= self._shiftindex else 0)
+
+    def __moveshift(self, index: int):
+        """Moves _shiftindex to index, offsets passed over are shifted."""
+        for idx in range(index, self._shiftindex):
+            self._starts[idx] = self._starts[idx] - self._shift
+        for idx in range(self._shiftindex, index):
+            self._starts[idx] = self._starts[idx] + self._shift
+
+        self._shiftindex = index
+
+    def __getend(self, index: int):
+
+        if index + 1 < len(self._starts):
+            return self.__start(index + 1)
+
+        return len(self._text)
+
+    @classmethod
+    def __getstarts(cls, statements: List[SQLDocumentStatement], offset: int):
+
+        starts = []
+        for statement in statements:
+            starts.append(offset)
+            offset = offset + len(statement.text)
+
+        return starts
+
+    @classmethod
+    def __getchange(cls, index: int, oldstatements: List[SQLDocumentStatement],
+            newstatements: List[SQLDocumentStatement]):
+
+        oldentities = [statement.entity for statement in oldstatements]
+        newentities = [statement.entity for statement in newstatements]
+
+        removed = [entity for entity in oldentities if entity is not None and entity not in newentities]
+        added = [entity for entity in newentities if entity is not None and entity not in oldentities]
+
+        return SQLDocumentChange(index=index, removed=removed, added=added)
+
+    @classmethod
+    def __parse_statements(cls, statements, reusable: List[SQLDocumentStatement]):
+
+        if isinstance(statements, str):
+            statements = splitstatements(statements)
+
+        cache = {statement.text: statement for statement in reusable}
+
+        return list(map(
+                lambda statement: cache.get(str(statement)) or cls.__create_statement(statement),
+                statements
+            )
+        )
+
+    @classmethod
+    def __create_statement(cls, statement: Statement):
+
+        text = str(statement)
+        unclosed = isunclosed(statement)
+        if isempty(statement):
+            return SQLDocumentStatement(text=text, entity=None, error=None, unclosed=unclosed)
+
+        try:
+            entity = SQLEntityFactory.create_entity_from_statement(statement)
+        except Exception as error:
+            return SQLDocumentStatement(text=text, entity=None, error=error, unclosed=unclosed)
+
+        return SQLDocumentStatement(text=text, entity=entity, error=None, unclosed=unclosed)
@@ -0,0 +1,267 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Table-level data lineage of sql statements and scripts.
+
+getlineage extracts target and source tables of a statement, including
+INSERT INTO ... SELECT, CREATE TABLE/VIEW ... AS SELECT, JOINs, subqueries
+and common table expressions. Aliases are resolved to table names.
+
+SQLLineageGraph keeps lineage edges of many scripts with upstream and downstream
+adjacency indexes. Consuming a changed script replaces only the edges of that script.
+
+Usage:
+graph = SQLLineageGraph()
+graph.consume_sql("etl/load_orders.sql", open("etl/load_orders.sql").read())
+tables: Set[str] = graph.downstream("orders", transitive=True)
+"""
+
+from collections import namedtuple, deque
+from typing import Dict, Iterable, List, Set, Tuple, Union
+from sqlparse import parse
+from sqlparse.sql import Statement, Token, TokenList, Identifier, IdentifierList, Function, Parenthesis
+import sqlparse.tokens as TType
+
+
+SQLLineage = namedtuple('SQLLineage', 'targets sources aliases')
+SQLLineage.__doc__ = """Tables written and read by one sql statement.
+
+    targets: tuple of table names written by the statement
+    sources: tuple of table names read by the statement
+    aliases: dict of alias and table name
+    Table names are lowercased, schema qualified names keep the schema, f.i. "sales.orders".
+    """
+
+# what the identifiers following the keyword are
+TARGET = "target"
+SOURCE = "source"
+CTE = "cte"
+ALIAS = "alias"
+
+# keywords between the keyword and the table name
+SKIPKEYWORDS = {"IF NOT EXISTS", "IF EXISTS", "ONLY"}
+
+
+def gettablename(token: Token):
+    """Returns lowercased, optionally schema qualified name of table identifier."""
+    name = token.get_real_name()
+    schema = token.get_parent_name()
+
+    return (f"{schema}.{name}" if schema else name).lower()
+
+class _SQLLineageCollector:
+
+    """Collects tables of one statement walking the sqlparse token tree.
+    Every nested group (subquery, where, parentheses) keeps its own keyword context.
+    Only names following UPDATE or DELETE can be aliases (UPDATE p ... FROM persons p),
+    names following FROM, JOIN, INTO or TABLE are tables and are not resolved."""
+
+    def __init__(self):
+        self.targets: List[str] = []
+        self.sources: List[str] = []
+        self.aliases: Dict[str, str] = {}
+        self.ctes: Set[str] = set()
+        self.references: List[str] = []
+
+    def collect(self, tokenlist: TokenList):
+
+        dml = None
+        expect = None
+        table = None
+        reference = False
+
+        for token in tokenlist.tokens:
+            if token.is_whitespace or token.ttype in TType.Comment or token.ttype in TType.Punctuation:
+                continue
+
+            if token.ttype in TType.Keyword:
+                keyword = token.normalized
+                reference = False
+                if token.ttype in TType.Keyword.DML or token.ttype in TType.Keyword.DDL:
+                    dml = keyword
+                    expect = TARGET if keyword in ("UPDATE", "DELETE") else None
+                    reference = expect == TARGET
+                elif token.ttype in TType.Keyword.CTE:
+                    expect = CTE
+                elif keyword == "INTO" or (keyword in ("TABLE", "VIEW") and dml == "CREATE"):
+                    expect = TARGET
+                elif keyword == "FROM":
+                    # DELETE FROM names the target unless DELETE alias FROM did already
+                    expect = TARGET if dml == "DELETE" and expect == TARGET else SOURCE
+                elif keyword.endswith("JOIN"):
+                    expect = SOURCE
+                elif keyword in SKIPKEYWORDS:
+                    pass
+                elif expect in (TARGET, SOURCE) and token.ttype is TType.Keyword:
+                    # table named by a non reserved keyword, f.i. data or user
+                    table = token.value.lower()
+                    (self.references if reference else self.targets if expect == TARGET else self.sources).append(table)
+                    expect = ALIAS
+                else:
+                    expect = None
+                continue
+
+            if expect == ALIAS and isinstance(token, Identifier) and len(token.tokens) == 1:
+                self.aliases[token.value.lower()] = table
+            elif expect in (TARGET, SOURCE, CTE) and isinstance(token, IdentifierList):
+                for identifier in token.get_identifiers():
+                    self.__add(identifier, expect, reference)
+            elif expect in (TARGET, SOURCE, CTE) and isinstance(token, (Identifier, Function)):
+                self.__add(token, expect, reference)
+            elif token.is_group:
+                self.collect(token)
+
+            expect = None
+
+    def __add(self, token: Token, expect: str, reference: bool = False):
+
+        if isinstance(token, Function):
+            # INSERT INTO table (column, ...)
+            identifier = token.token_first()
+            if isinstance(identifier, Identifier):
+                self.__add(identifier, expect)
+            return
+
+        if not isinstance(token, Identifier):
+            if token.is_group:
+                self.collect(token)
+            return
+
+        subqueries = [child for child in token.tokens if isinstance(child, Parenthesis)]
+        if expect == CTE:
+            self.ctes.add(token.token_first().value.lower())
+        elif not subqueries:
+            table = gettablename(token)
+            alias = token.get_alias()
+            if alias and alias.lower() != table:
+                self.aliases[alias.lower()] = table
+            (self.references if reference else self.targets if expect == TARGET else self.sources).append(table)
+
+        for subquery in subqueries:
+            self.collect(subquery)
+
+    def getlineage(self):
+
+        def resolve(names: List[str], references: List[str] = ()):
+            tables = set(names) | {self.aliases.get(name, name) for name in references}
+            return tuple(sorted(tables - self.ctes))
+
+        return SQLLineage(targets=resolve(self.targets, self.references), sources=resolve(self.sources),
+            aliases=dict(self.aliases))
+
+def getlineage(sql: Union[str, Statement]):
+    """Returns SQLLineage of a single sql statement string or sqlparse.sql.Statement."""
+    statement = parse(sql)[0] if isinstance(sql, str) else sql
+    collector = _SQLLineageCollector()
+    collector.collect(statement)
+
+    return collector.getlineage()
+
+def getscriptlineage(script: str):
+    """Returns list of SQLLineage, one for every statement of the sql script."""
+    return [getlineage(statement) for statement in parse(script) if str(statement).strip()]
+
+
+class SQLLineageGraph:
+
+    """Directed graph of tables, edge source -> target exists when some statement
+    of some script reads source and writes target.
+
+    Every edge remembers the scripts defining it, consume of a script compares
+    its new edges with the previous ones and updates only the difference, so the
+    cost of re-ingesting a changed script does not depend on the size of the graph.
+    """
+
+    def __init__(self):
+        self._scripts: Dict[str, Set[Tuple[str, str]]] = {}
+        self._edges: Dict[Tuple[str, str], Set[str]] = {}
+        self._downstream: Dict[str, Set[str]] = {}
+        self._upstream: Dict[str, Set[str]] = {}
+
+    def consume_sql(self, script: str, sql: str):
+        """Replaces lineage of script by lineage of all statements in sql."""
+        self.consume(script, getscriptlineage(sql))
+
+    def consume(self, script: str, lineages: Iterable[SQLLineage]):
+        """Replaces lineage of script by edges of lineages."""
+        edges = {(source, target)
+            for lineage in lineages
+            for target in lineage.targets
+            for source in lineage.sources
+            if source != target}
+        previous = self._scripts.get(script, set())
+
+        for edge in previous - edges:
+            self.__remove_edge(edge, script)
+        for edge in edges - previous:
+            self.__add_edge(edge, script)
+
+        if edges:
+            self._scripts[script] = edges
+        else:
+            self._scripts.pop(script, None)
+
+    def remove(self, script: str):
+        """Removes all edges of script."""
+        self.consume(script, [])
+
+    def __add_edge(self, edge: Tuple[str, str], script: str):
+
+        source, target = edge
+        self._edges.setdefault(edge, set()).add(script)
+        self._downstream.setdefault(source, set()).add(target)
+        self._upstream.setdefault(target, set()).add(source)
+
+    def __remove_edge(self, edge: Tuple[str, str], script: str):
+
+        source, target = edge
+        scripts = self._edges[edge]
+        scripts.discard(script)
+        if scripts:
+            return
+
+        del self._edges[edge]
+        for index, node, other in ((self._downstream, source, target), (self._upstream, target, source)):
+            index[node].discard(other)
+            if not index[node]:
+                del index[node]
+
+    def __traverse(self, index: Dict[str, Set[str]], table: str, transitive: bool):
+
+        table = table.lower()
+        if not transitive:
+            return set(index.get(table, ()))
+
+        visited: Set[str] = set()
+        queue = deque([table])
+        while queue:
+            for other in index.get(queue.popleft(), ()):
+                if other not in visited:
+                    visited.add(other)
+                    queue.append(other)
+
+        visited.discard(table)
+        return visited
+
+    def upstream(self, table: str, transitive: bool = False):
+        """Returns set of tables table is loaded from, all ancestors if transitive."""
+        return self.__traverse(self._upstream, table, transitive)
+
+    def downstream(self, table: str, transitive: bool = False):
+        """Returns set of tables loaded from table, all descendants if transitive."""
+        return self.__traverse(self._downstream, table, transitive)
+
+    def scripts(self, source: str, target: str):
+        """Returns set of scripts defining the edge source -> target."""
+        return set(self._edges.get((source.lower(), target.lower()), ()))
+
+    @property
+    def tables(self):
+        """Set of all tables with at least one edge."""
+        return set(self._downstream) | set(self._upstream)
+
+    @property
+    def edges(self):
+        """Set of all (source, target) edges."""
+        return set(self._edges)
@@ -100,7 +100,8 @@ def getcolumntype(token: Token):
 
 def isvaluein(token: Token, keyword: str):
     """Returns true if sqlparse.sql.Token is a value preceeded by a specific keyword."""
-    return (token.ttype in (TType.String.Single, TType.Number.Integer)
+    return ((token.ttype in (TType.String.Single, TType.Number.Integer, TType.Number.Float)
+            or (token.ttype in TType.Keyword and token.normalized in ("NULL", "TRUE", "FALSE")))
         and (isinstance(token.parent, (IdentifierList))
             or (isinstance(token.parent, (Comparison))
                 and iskeywordpreceding(token.parent, keyword)
@@ -131,8 +132,13 @@ def isandor(token: Token):
 
 def getnexttoken(token: Token):
     """Returns next sqlparse.sql.token in a list. Whitespaces skipped."""
-    tokens = list(token.parent.tokens)
-    nextidx = tokens.index(token) + 1
+    tokens = token.parent.tokens
+    return getnexttokenafter(tokens, tokens.index(token))
+
+def getnexttokenafter(tokens: list, idx: int):
+    """Returns sqlparse.sql.token following the token at idx in tokens. Whitespaces skipped.
+    Avoids the lookup of the token index when iterating over tokens."""
+    nextidx = idx + 1
 
     while nextidx < len(tokens) and tokens[nextidx].is_whitespace:
         nextidx = nextidx + 1
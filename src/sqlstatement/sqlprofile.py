@@ -0,0 +1,278 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Profiling mode attributing parse cost to sqlparseutils predicates and
+SQLEntityFactory helpers.
+
+While SQLProfiler is active, functions of sqlparseutils and sqlvalues, classmethods
+of SQLEntityFactory, processors in SQLProcessor and sqlparse.parse called by the factory
+are replaced by wrappers counting calls, cumulative and self time. Every top level call
+(usually create_entity) is one statement, its cost is attributed to the statement kind
+(key of SQLHeader) and the power of two bucket of its size in bytes.
+
+Wrappers add constant overhead per call, so absolute times are inflated and the shares
+of the functions are what to compare. Functions are patched process wide, profile
+in a single thread.
+
+Usage:
+with SQLProfiler() as profiler:
+    for sql in statements:
+        SQLEntityFactory.create_entity(sql)
+print(profiler.format_summary(limit=20))
+with open("parse.folded", "w") as out:
+    profiler.write_collapsed(out)
+"""
+
+import functools
+import inspect
+import time
+from collections import namedtuple
+from typing import Dict, List, TextIO, Tuple
+from sqlparse.sql import Token
+
+from .sql import SQLEntityFactory, SQLProcessor, SQLHeader
+from . import sql, sqlparseutils, sqlvalues
+
+
+SQLProfileRow = namedtuple('SQLProfileRow', 'kind size function calls cumulative self share')
+SQLProfileRow.__doc__ = """Cost of one function for one statement kind and size bucket.
+
+    size: upper bound of statement size bucket in bytes
+    cumulative: seconds including called functions, recursive calls counted once
+    self: seconds excluding called functions
+    share: cumulative as share of the time of all statements of the kind and size
+    """
+
+PROFILEDMODULES = (sqlparseutils, sqlvalues)
+UNKNOWNKIND = "UNKNOWN"
+
+
+def sizebucket(size: int):
+    """Returns upper bound of power of two bucket of size."""
+    return 1 << max(size - 1, 0).bit_length()
+
+def getkind(funcname: str):
+    """Returns statement kind of SQLProcessor or SQLHeader key as the key of SQLHeader,
+    f.i. UPDATE for UPDATESET and UPDATESETWHERE."""
+    if funcname in SQLHeader:
+        return funcname
+
+    return max((header for header in SQLHeader if funcname.startswith(header)), key=len, default=funcname)
+
+def getsize(args: tuple):
+    """Returns size in bytes of the first sql string or sqlparse token in args."""
+    for arg in args:
+        if isinstance(arg, str):
+            return len(arg.encode())
+        if isinstance(arg, Token):
+            return len(str(arg).encode())
+
+    return 0
+
+
+class SQLProfiler:
+
+    """Counts calls and time of parsing functions per statement kind and size.
+
+    functions: dict of (kind, size, function) and [calls, cumulative ns, self ns]
+    stacks: dict of (kind, size, *call stack) and self ns, source of the collapsed stacks
+    statements: dict of (kind, size) and [statements, ns]
+    """
+
+    def __init__(self):
+        self.functions: Dict[Tuple, List[int]] = {}
+        self.stacks: Dict[Tuple, int] = {}
+        self.statements: Dict[Tuple[str, int], List[int]] = {}
+        self._restore: List[Tuple] = []
+        self._processors: Dict = {}
+        self._stack: List[str] = []
+        self._children: List[int] = []
+        self.__reset_statement()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __reset_statement(self):
+
+        self._kind = None
+        self._size = 0
+        self._calls: Dict[str, List[int]] = {}
+        self._selftimes: Dict[Tuple[str, ...], int] = {}
+
+    def start(self):
+        """Replaces profiled functions by counting wrappers."""
+        if self._restore:
+            return
+
+        for module in PROFILEDMODULES:
+            prefix = module.__name__.rsplit(".", 1)[-1]
+            for name, function in list(vars(module).items()):
+                if inspect.isfunction(function) and function.__module__ == module.__name__:
+                    self._restore.append((module, name, function))
+                    setattr(module, name, self.__wrap(f"{prefix}.{name}", function))
+
+        for name, method in list(vars(SQLEntityFactory).items()):
+            if isinstance(method, classmethod):
+                label = "SQLEntityFactory." + name.replace("_SQLEntityFactory__", "__")
+                kindof = self.__headerkind if name == "_SQLEntityFactory__getheader" else None
+                self._restore.append((SQLEntityFactory, name, method))
+                setattr(SQLEntityFactory, name, classmethod(self.__wrap(label, method.__func__, kindof)))
+
+        self._restore.append((sql, "parse", sql.parse))
+        sql.parse = self.__wrap("sqlparse.parse", sql.parse)
+
+        # processors are bound at import time, patching the class does not reach them
+        self._processors = dict(SQLProcessor)
+        for funcname, processor in self._processors.items():
+            SQLProcessor[funcname] = self.__wrap(f"SQLEntityFactory.{processor.__name__}", processor,
+                lambda result, kind=getkind(funcname): kind)
+
+    def stop(self):
+        """Restores the original functions, collected counts are kept."""
+        for owner, name, function in reversed(self._restore):
+            setattr(owner, name, function)
+        SQLProcessor.update(self._processors)
+
+        self._restore = []
+        self._processors = {}
+
+    def __headerkind(self, result):
+
+        funcname, _ = result
+        return funcname if funcname in SQLHeader else None
+
+    def __wrap(self, label: str, function, kindof=None):
+
+        profiler = self
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return profiler.__call(label, function, kindof, args, kwargs)
+
+        return wrapper
+
+    def __call(self, label: str, function, kindof, args: tuple, kwargs: dict):
+
+        stack = self._stack
+        root = not stack
+        if root:
+            self._size = getsize(args)
+
+        stack.append(label)
+        self._children.append(0)
+        clock = time.perf_counter_ns
+        start = clock()
+        try:
+            result = function(*args, **kwargs)
+            if kindof is not None and self._kind is None:
+                self._kind = kindof(result)
+            return result
+        finally:
+            elapsed = clock() - start
+            selftime = elapsed - self._children.pop()
+            key = tuple(stack)
+            stack.pop()
+            if self._children:
+                self._children[-1] = self._children[-1] + elapsed
+
+            counts = self._calls.setdefault(label, [0, 0, 0])
+            counts[0] = counts[0] + 1
+            if label not in stack:
+                counts[1] = counts[1] + elapsed
+            counts[2] = counts[2] + selftime
+            self._selftimes[key] = self._selftimes.get(key, 0) + selftime
+
+            if root:
+                self.__add_statement(elapsed)
+
+    def __add_statement(self, elapsed: int):
+
+        kind = self._kind or UNKNOWNKIND
+        size = sizebucket(self._size)
+
+        statements = self.statements.setdefault((kind, size), [0, 0])
+        statements[0] = statements[0] + 1
+        statements[1] = statements[1] + elapsed
+
+        for label, (calls, cumulative, selftime) in self._calls.items():
+            counts = self.functions.setdefault((kind, size, label), [0, 0, 0])
+            counts[0] = counts[0] + calls
+            counts[1] = counts[1] + cumulative
+            counts[2] = counts[2] + selftime
+
+        for key, selftime in self._selftimes.items():
+            self.stacks[(kind, size) + key] = self.stacks.get((kind, size) + key, 0) + selftime
+
+        self.__reset_statement()
+
+    def __grouped(self, bykind: bool, bysize: bool):
+        """Returns functions and statements summed over kinds and/or sizes, kind "*"
+        and size 0 stand for all of them."""
+        def group(kind: str, size: int):
+            return (kind if bykind else "*", size if bysize else 0)
+
+        functions: Dict[Tuple, List[int]] = {}
+        for (kind, size, label), counts in self.functions.items():
+            summed = functions.setdefault(group(kind, size) + (label,), [0, 0, 0])
+            for idx, count in enumerate(counts):
+                summed[idx] = summed[idx] + count
+
+        statements: Dict[Tuple[str, int], List[int]] = {}
+        for (kind, size), counts in self.statements.items():
+            summed = statements.setdefault(group(kind, size), [0, 0])
+            for idx, count in enumerate(counts):
+                summed[idx] = summed[idx] + count
+
+        return functions, statements
+
+    def rows(self, bykind: bool = True, bysize: bool = True):
+        """Returns list of SQLProfileRow ordered by kind, size and cumulative time.
+        Without bykind or bysize the rows are summed over all kinds or sizes."""
+        functions, statements = self.__grouped(bykind, bysize)
+        rows = [SQLProfileRow(kind=kind, size=size, function=label, calls=calls,
+                cumulative=cumulative / 1e9, self=selftime / 1e9,
+                share=cumulative / statements[(kind, size)][1] if statements[(kind, size)][1] else 0.0)
+            for (kind, size, label), (calls, cumulative, selftime) in functions.items()]
+
+        return sorted(rows, key=lambda row: (row.kind, row.size, -row.cumulative, row.function))
+
+    def format_summary(self, limit: int = None, bykind: bool = True, bysize: bool = True):
+        """Returns table of the costliest functions per statement kind and size,
+        at most limit functions for each of them."""
+        rows = self.rows(bykind, bysize)
+        _, statements = self.__grouped(bykind, bysize)
+        kindwidth = max([len("kind")] + [len(row.kind) for row in rows])
+        functionwidth = max([len("function")] + [len(row.function) for row in rows])
+
+        lines = [f"{'kind':<{kindwidth}} {'size':>9} {'function':<{functionwidth}} {'calls':>10} "
+            f"{'cum ms':>10} {'self ms':>10} {'us/call':>9} {'share':>6}"]
+        shown: Dict[Tuple[str, int], int] = {}
+
+        for row in rows:
+            group = (row.kind, row.size)
+            if limit is not None and shown.get(group, 0) >= limit:
+                continue
+            shown[group] = shown.get(group, 0) + 1
+
+            if shown[group] == 1:
+                count, elapsed = statements[group]
+                size = f"<={row.size}" if bysize else "*"
+                lines.append(f"{row.kind:<{kindwidth}} {size:>9} {count} statements, {elapsed / 1e6:.1f} ms")
+            lines.append(f"{'':<{kindwidth}} {'':>9} {row.function:<{functionwidth}} {row.calls:>10} "
+                f"{row.cumulative * 1e3:>10.2f} {row.self * 1e3:>10.2f} "
+                f"{row.cumulative * 1e6 / row.calls:>9.1f} {row.share:>6.1%}")
+
+        return "\n".join(lines)
+
+    def write_collapsed(self, out: TextIO):
+        """Writes collapsed stacks (kind;size;frame;...;frame microseconds) readable
+        by flamegraph.pl, speedscope and similar tools. Self time is the weight."""
+        for (kind, size, *frames), selftime in sorted(self.stacks.items()):
+            microseconds = selftime // 1000
+            if microseconds:
+                out.write(";".join([kind, f"<={size}B"] + frames) + f" {microseconds}\n")
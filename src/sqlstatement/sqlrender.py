@@ -0,0 +1,387 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Rendering of SQL entities back to sql statement strings. SQLRenderer is the
+reverse of SQLEntityFactory, entity rendered by SQLRenderer and parsed again
+by SQLEntityFactory results in the same entity.
+
+Usage:
+sql: str = SQLRenderer.render(entity)
+SQLRenderer.write(entity, out)
+SQLRenderer.write_inserts(entity, out, batchsize=1000)
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO, UnsupportedOperation
+from typing import Iterable, List, TextIO
+
+from .sqlentities import (SQLDatabase, SQLTable, SQLColumn, SQLConstraintUnique,
+    SQLConstraintNotNull, SQLConstraintPrimaryKey, SQLAnd)
+from .sqlactions import SQLDDLAction, SQLDMLAction
+
+
+# fixed parts of every statement written around the table or database name
+SQLTemplate = {
+    (SQLDatabase, SQLDDLAction.CREATE): ("CREATE DATABASE ", ";"),
+    (SQLDatabase, SQLDDLAction.DROP): ("DROP DATABASE ", ";"),
+    (SQLTable, SQLDDLAction.CREATE): ("CREATE TABLE ", " (", ");"),
+    (SQLTable, SQLDDLAction.DROP): ("DROP TABLE ", ";"),
+    (SQLTable, SQLDDLAction.DROPCONSTRAINT): ("ALTER TABLE ", " DROP CONSTRAINT ", ";"),
+    (SQLTable, SQLDDLAction.ADDCOLUMN): ("ALTER TABLE ", " ADD ", ";"),
+    (SQLTable, SQLDDLAction.MODIFYCOLUMN): ("ALTER TABLE ", " MODIFY COLUMN ", ";"),
+    (SQLTable, SQLDDLAction.DROPCOLUMN): ("ALTER TABLE ", " DROP COLUMN ", ";"),
+    (SQLConstraintNotNull, SQLDDLAction.ADDCONSTRAINT): ("ALTER TABLE ", " MODIFY ", ";"),
+    (SQLConstraintUnique, SQLDDLAction.ADDCONSTRAINT): ("ALTER TABLE ", " ADD CONSTRAINT ", " UNIQUE (", ");"),
+    (SQLConstraintPrimaryKey, SQLDDLAction.ADDCONSTRAINT): ("ALTER TABLE ", " ADD CONSTRAINT ", " PRIMARY KEY (", ");"),
+    (SQLTable, SQLDMLAction.INSERT): ("INSERT INTO ", " VALUES ", ";"),
+    (SQLTable, SQLDMLAction.UPDATE): ("UPDATE ", " SET ", ";"),
+    (SQLTable, SQLDMLAction.SELECT): ("SELECT ", " FROM ", ";"),
+    (SQLTable, SQLDMLAction.DELETE): ("DELETE FROM ", ";"),
+}
+
+SQLConstraintKeyword = {
+    SQLConstraintPrimaryKey: " PRIMARY KEY",
+    SQLConstraintUnique: " UNIQUE",
+    SQLConstraintNotNull: " NOT NULL",
+}
+
+SQLWhereOperator = {
+    SQLDMLAction.WHEREEQUAL: "=",
+    SQLDMLAction.WHERELIKE: " LIKE ",
+}
+
+
+class SQLRenderer:
+
+    """Renderer writing SQLDatabase and SQLTable entities as sql statements.
+
+    Entities are written piece by piece to a text stream (file, StringIO),
+    so no intermediate string is built for the statement or its values.
+    Argument typed mirrors SQLParseOptions.typed of the parsed entity. Typed values
+    are written as sql literals by their python type with quotes in strings escaped.
+    Untyped values are always written verbatim in quotes. Untyped entity does not know
+    whether the value was a string, number or NULL literal, so its rendering is parsed
+    back to the same entity, but f.i. NULL is written as 'NULL'. To generate sql
+    executed by a database pass typed entity and typed=True.
+    """
+
+    @classmethod
+    def render(cls, entity, typed: bool = False):
+        """Returns sql statement string of SQLDatabase or SQLTable."""
+        out = StringIO()
+        cls.write(entity, out, typed)
+
+        return out.getvalue()
+
+    @classmethod
+    def write_script(cls, entities: Iterable, out: TextIO, typed: bool = False):
+        """Writes sql statements of all entities separated by new line."""
+        for entity in entities:
+            cls.write(entity, out, typed)
+            out.write("\n")
+
+    @classmethod
+    def write(cls, entity, out: TextIO, typed: bool = False):
+        """Writes sql statement of SQLDatabase or SQLTable to the text stream."""
+        if isinstance(entity, SQLDatabase):
+            return cls.__write_sqldatabase(entity, out)
+
+        action = entity.action
+        if action == SQLDDLAction.ALTER:
+            action = entity.columns[0].action
+        elif action == SQLDDLAction.ADDCONSTRAINT:
+            return cls.__write_addconstraint(entity, out)
+
+        writer = SQLWriter.get(action)
+        if writer is None:
+            raise UnsupportedOperation(f"Rendering of {action} is not supported.")
+
+        return writer(entity, out, SQLTemplate[(SQLTable, action)], typed)
+
+    @classmethod
+    def write_inserts(cls, entity: SQLTable, out: TextIO, batchsize: int = 1000, maxsize: int = None,
+            typed: bool = False):
+        """Writes INSERT of multi-row SQLTable (column values are lists or arrays
+        of the same length) as statements of at most batchsize rows. With maxsize
+        a row is written to the next statement if it would make the statement longer than
+        maxsize characters, only statement of a single row exceeding maxsize is longer.
+        Single-row SQLTable is written as one statement."""
+        if entity.columns and not cls.__ismultirow(entity.columns[0].value):
+            cls.write_insert(entity, out, SQLTemplate[(SQLTable, SQLDMLAction.INSERT)], typed)
+            out.write("\n")
+            return
+
+        rowcount = len(entity.columns[0].value) if entity.columns else 0
+        head, values, tail = SQLTemplate[(SQLTable, SQLDMLAction.INSERT)]
+
+        row = 0
+        while row < rowcount:
+            size = out.write(head) + out.write(entity.name) + cls.__write_columnnames(entity.columns, out)
+            size = size + out.write(values)
+
+            first = row
+            while row < min(first + batchsize, rowcount):
+                rowvalues = list(map(lambda column: column.value[row], entity.columns))
+                separator = ", " if row > first else ""
+                if maxsize is None:
+                    size = size + out.write(separator) + cls.__write_row(rowvalues, out, typed)
+                else:
+                    # row is measured before it is written to close the statement in time
+                    rowtext = StringIO()
+                    cls.__write_row(rowvalues, rowtext, typed)
+                    rowtext = rowtext.getvalue()
+                    if row > first and size + len(separator) + len(rowtext) + len(tail) > maxsize:
+                        break
+                    size = size + out.write(separator) + out.write(rowtext)
+                row = row + 1
+
+            out.write(tail)
+            out.write("\n")
+
+    @classmethod
+    def __write_sqldatabase(cls, entity: SQLDatabase, out: TextIO):
+
+        head, tail = SQLTemplate[(SQLDatabase, entity.action)]
+        out.write(head)
+        out.write(entity.name)
+        out.write(tail)
+
+    @classmethod
+    def __write_value(cls, value, out: TextIO, typed: bool):
+
+        if not typed:
+            return out.write("'") + out.write(value) + out.write("'")
+        if hasattr(value, "item"):
+            # NumPy scalar of arrays=True column
+            value = value.item()
+        if value is None:
+            return out.write("NULL")
+        if isinstance(value, bool):
+            return out.write("TRUE" if value else "FALSE")
+        if isinstance(value, (int, float, Decimal)):
+            return out.write(str(value))
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+
+        return out.write("'") + out.write(str(value).replace("'", "''")) + out.write("'")
+
+    @classmethod
+    def __ismultirow(cls, value):
+
+        return not isinstance(value, (str, bytes)) and hasattr(value, "__len__")
+
+    @classmethod
+    def __write_row(cls, values: List, out: TextIO, typed: bool):
+
+        size = out.write("(")
+        for idx, value in enumerate(values):
+            if idx:
+                size = size + out.write(", ")
+            size = size + cls.__write_value(value, out, typed)
+
+        return size + out.write(")")
+
+    @classmethod
+    def __write_names(cls, names: List[str], out: TextIO, separator: str = ", "):
+
+        size = 0
+        for idx, name in enumerate(names):
+            if idx:
+                size = size + out.write(separator)
+            size = size + out.write(name)
+
+        return size
+
+    @classmethod
+    def __write_columnnames(cls, columns: List[SQLColumn], out: TextIO):
+
+        if not columns or columns[0].name is None:
+            return 0
+
+        return out.write(" (") + cls.__write_names([column.name for column in columns], out) + out.write(")")
+
+    @classmethod
+    def __write_columndefinition(cls, column: SQLColumn, out: TextIO):
+
+        out.write(column.name)
+        if column.type is not None:
+            out.write(" ")
+            out.write(column.type)
+        if column.size is not None:
+            out.write("(")
+            out.write(column.size)
+            out.write(")")
+        for constraint in column.constraints or []:
+            out.write(SQLConstraintKeyword[type(constraint)])
+
+    @classmethod
+    def __write_columndefinitions(cls, columns: List[SQLColumn], out: TextIO):
+
+        for idx, column in enumerate(columns):
+            if idx:
+                out.write(", ")
+            cls.__write_columndefinition(column, out)
+
+    @classmethod
+    def __write_condition(cls, condition: List, out: TextIO, typed: bool):
+
+        if len(condition) == 1 and isinstance(condition[0], SQLColumn):
+            column: SQLColumn = condition[0]
+            out.write(column.name)
+            out.write(SQLWhereOperator[column.action])
+            cls.__write_value(column.value, out, typed)
+        else:
+            out.write("( ")
+            cls.__write_filters(condition, out, typed)
+            out.write(" )")
+
+    @classmethod
+    def __write_filters(cls, filters: List, out: TextIO, typed: bool):
+
+        for idx, item in enumerate(filters):
+            if idx:
+                out.write(" AND " if isinstance(item, SQLAnd) else " OR ")
+            cls.__write_condition(item.filter, out, typed)
+
+    @classmethod
+    def __write_where(cls, where: List, out: TextIO, typed: bool):
+
+        if where:
+            out.write(" WHERE ")
+            cls.__write_filters(where, out, typed)
+
+    @classmethod
+    def write_createtable(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes CREATE TABLE sql statement."""
+        head, columns, tail = template
+        out.write(head)
+        out.write(entity.name)
+        out.write(columns)
+        cls.__write_columndefinitions(entity.columns, out)
+        out.write(tail)
+
+    @classmethod
+    def write_droptable(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes DROP TABLE sql statement."""
+        head, tail = template
+        out.write(head)
+        out.write(entity.name)
+        out.write(tail)
+
+    @classmethod
+    def write_altertable(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes ALTER TABLE ADD, MODIFY COLUMN or DROP COLUMN sql statement."""
+        head, action, tail = template
+        out.write(head)
+        out.write(entity.name)
+        out.write(action)
+        cls.__write_columndefinitions(entity.columns, out)
+        out.write(tail)
+
+    @classmethod
+    def write_dropconstraint(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes ALTER TABLE DROP CONSTRAINT sql statement."""
+        head, action, tail = template
+        out.write(head)
+        out.write(entity.name)
+        out.write(action)
+        out.write(entity.columns[0].constraints[0].name)
+        out.write(tail)
+
+    @classmethod
+    def __write_addconstraint(cls, entity: SQLTable, out: TextIO):
+
+        constraint = entity.columns[0].constraints[0]
+        template = SQLTemplate[(type(constraint), SQLDDLAction.ADDCONSTRAINT)]
+
+        if isinstance(constraint, SQLConstraintNotNull):
+            head, action, tail = template
+            out.write(head)
+            out.write(entity.name)
+            out.write(action)
+            cls.__write_columndefinitions(entity.columns, out)
+            out.write(tail)
+            return
+
+        head, action, columns, tail = template
+        out.write(head)
+        out.write(entity.name)
+        out.write(action)
+        out.write(constraint.name)
+        out.write(columns)
+        cls.__write_names([column.name for column in entity.columns], out, ",")
+        out.write(tail)
+
+    @classmethod
+    def write_insert(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes INSERT INTO sql statement. Multi-row entity is written as a single
+        statement, see write_inserts for batches."""
+        head, values, tail = template
+        out.write(head)
+        out.write(entity.name)
+        cls.__write_columnnames(entity.columns, out)
+        out.write(values)
+
+        if entity.columns and cls.__ismultirow(entity.columns[0].value):
+            for idx in range(len(entity.columns[0].value)):
+                if idx:
+                    out.write(", ")
+                cls.__write_row(list(map(lambda column: column.value[idx], entity.columns)), out, typed)
+        else:
+            cls.__write_row([column.value for column in entity.columns], out, typed)
+
+        out.write(tail)
+
+    @classmethod
+    def write_update(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes UPDATE sql statement."""
+        head, assignments, tail = template
+        out.write(head)
+        out.write(entity.name)
+        out.write(assignments)
+
+        for idx, column in enumerate(entity.columns):
+            if idx:
+                out.write(", ")
+            out.write(column.name)
+            out.write("=")
+            cls.__write_value(column.value, out, typed)
+
+        cls.__write_where(entity.where, out, typed)
+        out.write(tail)
+
+    @classmethod
+    def write_select(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes SELECT FROM sql statement."""
+        head, source, tail = template
+        out.write(head)
+        cls.__write_names([column.name for column in entity.columns], out)
+        out.write(source)
+        out.write(entity.name)
+        cls.__write_where(entity.where, out, typed)
+        out.write(tail)
+
+    @classmethod
+    def write_delete(cls, entity: SQLTable, out: TextIO, template, typed: bool = False):
+        """Writes DELETE FROM sql statement."""
+        head, tail = template
+        out.write(head)
+        out.write(entity.name)
+        cls.__write_where(entity.where, out, typed)
+        out.write(tail)
+
+
+SQLWriter = {
+    SQLDDLAction.CREATE: SQLRenderer.write_createtable,
+    SQLDDLAction.DROP: SQLRenderer.write_droptable,
+    SQLDDLAction.ADDCOLUMN: SQLRenderer.write_altertable,
+    SQLDDLAction.MODIFYCOLUMN: SQLRenderer.write_altertable,
+    SQLDDLAction.DROPCOLUMN: SQLRenderer.write_altertable,
+    SQLDDLAction.DROPCONSTRAINT: SQLRenderer.write_dropconstraint,
+    SQLDMLAction.INSERT: SQLRenderer.write_insert,
+    SQLDMLAction.UPDATE: SQLRenderer.write_update,
+    SQLDMLAction.SELECT: SQLRenderer.write_select,
+    SQLDMLAction.DELETE: SQLRenderer.write_delete,
+}
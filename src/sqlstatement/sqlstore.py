@@ -0,0 +1,524 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Columnar on-disk store of parsed sql entities.
+
+SQLStoreWriter writes entities column by column: table, column and type names
+are dictionary encoded, SQLDDLAction and SQLDMLAction are stored as small integer
+codes and values as offsets into a values blob. SQLStoreReader memory-maps
+the file and answers filters directly over the mapped columns (as NumPy arrays when
+NumPy is installed, as memoryviews otherwise). Entities are materialized on demand.
+
+Layout (little-endian): magic, section table of (name, offset, length) and sections
+aligned to 8 bytes. Statement sections have one item per entity, column, constraint
+and where sections one item per SQLColumn, SQLConstraint and where condition. Sections
+ending with "start" hold n+1 offsets of the rows belonging to the item i.
+
+Usage:
+with SQLStoreWriter("day.sqlstore") as writer:
+    writer.write_sql(open("queries.log"))
+
+with SQLStoreReader("day.sqlstore") as reader:
+    for entity in reader.entities(reader.select(table="persons", action=SQLDMLAction.DELETE)):
+        ...
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date, datetime
+from decimal import Decimal
+from io import UnsupportedOperation
+from typing import Dict, Iterable, List, Optional
+
+from .sql import SQLEntityFactory
+from .sqlentities import (SQLDatabase, SQLTable, SQLColumn, SQLConstraint, SQLConstraintPrimaryKey,
+    SQLConstraintUnique, SQLConstraintNotNull, SQLConstraintDefault, SQLAnd, SQLOr)
+from .sqlactions import SQLDDLAction, SQLDMLAction
+
+
+MAGIC = b"SQLSTOR1"
+SECTIONENTRY = struct.Struct("<8sQQ")
+NONE = 0xFFFFFFFF
+NOACTION = 0xFF
+
+# section name and array typecode, "B" sections are raw bytes
+SECTIONS = {
+    "kind": "B", "name": "I", "action": "B", "flags": "B",
+    "colstart": "I", "wstart": "I", "tstart": "Q",
+    "colname": "I", "colact": "B", "coltype": "I", "colsize": "I", "colflags": "B", "colvalue": "Q",
+    "constart": "I",
+    "conkind": "B", "conname": "I", "conact": "B", "convalue": "Q",
+    "wname": "I", "wact": "B", "wvalue": "Q",
+    "strstart": "Q", "strings": "B", "actions": "B", "tree": "B",
+    "colblob": "B", "conblob": "B", "wblob": "B",
+}
+
+# offsets section and values blob it points to
+VALUEBLOBS = {"colvalue": "colblob", "convalue": "conblob", "wvalue": "wblob"}
+
+ENTITYKINDS = [SQLDatabase, SQLTable]
+CONSTRAINTKINDS = [SQLConstraint, SQLConstraintPrimaryKey, SQLConstraintUnique, SQLConstraintNotNull,
+    SQLConstraintDefault]
+ACTIONS = list(SQLDDLAction) + list(SQLDMLAction)
+
+# flags of entity and column
+HASCOLUMNS = 1
+HASWHERE = 2
+HASCONSTRAINTS = 1
+
+# opcodes of the where tree, C stands for one row of where sections
+TREEOPEN = {SQLAnd: b"A", SQLOr: b"O"}
+TREECOLUMN = b"C"
+TREECLOSE = b")"
+
+VALUELENGTH = struct.Struct("<I")
+
+
+def encode_value(value):
+    """Returns bytes of value tagged by its python type. Lists (and NumPy arrays
+    of multi-row INSERT) are encoded item by item and decoded as lists."""
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+
+    match value:
+        case None:
+            return b"n"
+        case str():
+            return b"s" + value.encode()
+        case bool():
+            return b"b" + (b"1" if value else b"0")
+        case int():
+            return b"i" + str(value).encode()
+        case float():
+            return b"f" + repr(value).encode()
+        case Decimal():
+            return b"d" + str(value).encode()
+        case datetime():
+            return b"T" + value.isoformat().encode()
+        case date():
+            return b"D" + value.isoformat().encode()
+        case list() | tuple():
+            items = [encode_value(item) for item in value]
+            return b"l" + b"".join(VALUELENGTH.pack(len(item)) + item for item in items)
+        case _:
+            raise UnsupportedOperation(f"Storing of {type(value).__name__} values is not supported.")
+
+def decode_value(data):
+    """Returns python value of bytes created by encode_value."""
+    tag, payload = data[:1], data[1:]
+
+    match bytes(tag):
+        case b"n":
+            return None
+        case b"s":
+            return str(payload, "utf-8")
+        case b"b":
+            return payload == b"1"
+        case b"i":
+            return int(payload)
+        case b"f":
+            return float(payload)
+        case b"d":
+            return Decimal(str(payload, "ascii"))
+        case b"T":
+            return datetime.fromisoformat(str(payload, "ascii"))
+        case b"D":
+            return date.fromisoformat(str(payload, "ascii"))
+        case b"l":
+            values = []
+            position = 0
+            while position < len(payload):
+                length, = VALUELENGTH.unpack_from(payload, position)
+                position = position + VALUELENGTH.size
+                values.append(decode_value(payload[position:position + length]))
+                position = position + length
+            return values
+        case _:
+            raise ValueError(f"Unknown value tag {bytes(tag)!r}")
+
+
+class SQLStoreWriter:
+
+    """Writes entities to the columnar store file. Columns are collected in memory
+    as compact arrays and written when the writer is closed.
+
+    Usage:
+    with SQLStoreWriter(path) as writer:
+        writer.write(entity)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.statements = 0
+        self.errors = 0
+        self._sections: Dict[str, array] = {name: array(typecode) for name, typecode in SECTIONS.items()}
+        self._strings: Dict[str, int] = {}
+        self._blobs: Dict[str, bytearray] = {blob: bytearray() for blob in VALUEBLOBS.values()}
+        self._tree = bytearray()
+
+        for name in ("colstart", "wstart", "tstart", "constart", "colvalue", "convalue", "wvalue"):
+            self._sections[name].append(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __string(self, value: Optional[str]):
+
+        if value is None:
+            return NONE
+
+        code = self._strings.get(value)
+        if code is None:
+            code = self._strings[value] = len(self._strings)
+
+        return code
+
+    def __value(self, section: str, value):
+
+        blob = self._blobs[VALUEBLOBS[section]]
+        blob += encode_value(value)
+        self._sections[section].append(len(blob))
+
+    def write_sql(self, statements: Iterable[str], **options):
+        """Parses and writes sql statement strings, options are passed to
+        SQLEntityFactory.create_entity. Statements which can not be parsed are counted in errors."""
+        for sql in statements:
+            try:
+                entity = SQLEntityFactory.create_entity(sql, **options)
+            except Exception:
+                self.errors = self.errors + 1
+                continue
+
+            self.write(entity)
+
+    def write(self, entity):
+        """Writes SQLDatabase or SQLTable entity."""
+        sections = self._sections
+        columns = getattr(entity, "columns", None)
+        where = getattr(entity, "where", None)
+
+        sections["kind"].append(ENTITYKINDS.index(type(entity)))
+        sections["name"].append(self.__string(entity.name))
+        sections["action"].append(ACTIONS.index(entity.action) if entity.action is not None else NOACTION)
+        sections["flags"].append((HASCOLUMNS if columns is not None else 0) | (HASWHERE if where is not None else 0))
+
+        for column in columns or []:
+            self.__write_column(column)
+        sections["colstart"].append(len(sections["colname"]))
+
+        for item in where or []:
+            self.__write_tree(item)
+        sections["wstart"].append(len(sections["wname"]))
+        sections["tstart"].append(len(self._tree))
+
+        self.statements = self.statements + 1
+
+    def __write_column(self, column: SQLColumn):
+
+        sections = self._sections
+        sections["colname"].append(self.__string(column.name))
+        sections["colact"].append(ACTIONS.index(column.action) if column.action is not None else NOACTION)
+        sections["coltype"].append(self.__string(column.type))
+        sections["colsize"].append(self.__string(column.size))
+        sections["colflags"].append(HASCONSTRAINTS if column.constraints is not None else 0)
+        self.__value("colvalue", column.value)
+
+        for constraint in column.constraints or []:
+            sections["conkind"].append(CONSTRAINTKINDS.index(type(constraint)))
+            sections["conname"].append(self.__string(constraint.name))
+            sections["conact"].append(ACTIONS.index(constraint.action) if constraint.action is not None else NOACTION)
+            self.__value("convalue", getattr(constraint, "value", None))
+        sections["constart"].append(len(sections["conkind"]))
+
+    def __write_tree(self, item):
+
+        if isinstance(item, SQLColumn):
+            sections = self._sections
+            self._tree += TREECOLUMN
+            sections["wname"].append(self.__string(item.name))
+            sections["wact"].append(ACTIONS.index(item.action) if item.action is not None else NOACTION)
+            self.__value("wvalue", item.value)
+            return
+
+        if type(item) not in TREEOPEN:
+            raise UnsupportedOperation(f"Storing of {type(item).__name__} where condition is not supported.")
+
+        self._tree += TREEOPEN[type(item)]
+        for child in item.filter:
+            self.__write_tree(child)
+        self._tree += TREECLOSE
+
+    def close(self):
+        """Writes all sections to the file."""
+        if self._sections is None:
+            return
+
+        strings = bytearray()
+        strstart = self._sections["strstart"]
+        strstart.append(0)
+        for value in self._strings:
+            strings += value.encode()
+            strstart.append(len(strings))
+
+        self._sections["strings"] = array("B", strings)
+        self._sections["actions"] = array("B", "\n".join(action.value for action in ACTIONS).encode())
+        self._sections["tree"] = array("B", self._tree)
+        for name, blob in self._blobs.items():
+            self._sections[name] = array("B", blob)
+
+        with open(self.path, "wb") as out:
+            position = len(MAGIC) + VALUELENGTH.size + SECTIONENTRY.size * len(SECTIONS)
+            entries = []
+            for name, section in self._sections.items():
+                if sys.byteorder == "big" and section.itemsize > 1:
+                    section.byteswap()
+                position = position + (-position % 8)
+                entries.append(SECTIONENTRY.pack(name.encode(), position, len(section) * section.itemsize))
+                position = position + len(section) * section.itemsize
+
+            out.write(MAGIC + VALUELENGTH.pack(len(entries)) + b"".join(entries))
+            for name, section in self._sections.items():
+                out.write(b"\0" * (-out.tell() % 8))
+                section.tofile(out)
+
+        self._sections = None
+
+
+class SQLStoreReader:
+
+    """Memory-maps the columnar store file. Sections are exposed without copying
+    as memoryviews, or as NumPy arrays when NumPy is installed and usenumpy is not False.
+    select answers filters on table name, action, column names and where column names
+    and returns positions of matching entities, entity and entities materialize them.
+
+    Usage:
+    with SQLStoreReader(path) as reader:
+        positions = reader.select(table="persons", action=SQLDMLAction.DELETE)
+        entities: List[SQLTable] = list(reader.entities(positions))
+    """
+
+    def __init__(self, path: str, usenumpy: Optional[bool] = None):
+        if sys.byteorder == "big":
+            raise UnsupportedOperation("Reading of the store on big-endian platforms is not supported.")
+
+        self.numpy = None
+        if usenumpy is not False:
+            try:
+                import numpy
+                self.numpy = numpy
+            except ImportError as error:
+                if usenumpy:
+                    raise ImportError("NumPy is required for array columns, install sqlstatement[numpy].") from error
+
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._raw: Dict[str, memoryview] = {}
+        self.sections: Dict = {}
+
+        if self._buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a sql store file.")
+
+        count, = VALUELENGTH.unpack_from(self._buffer, len(MAGIC))
+        for idx in range(count):
+            name, offset, length = SECTIONENTRY.unpack_from(self._buffer,
+                len(MAGIC) + VALUELENGTH.size + idx * SECTIONENTRY.size)
+            self._raw[name.rstrip(b"\0").decode()] = self._buffer[offset:offset + length]
+
+        self.sections = {name: self.__section(name, typecode) for name, typecode in SECTIONS.items()}
+
+        strstart = self._raw["strstart"].cast("Q")
+        strings = self._raw["strings"]
+        self.strings: List[str] = [str(strings[strstart[idx]:strstart[idx + 1]], "utf-8")
+            for idx in range(len(strstart) - 1)]
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self.strings)}
+
+        actions = {action.value: action for action in ACTIONS}
+        self.actions = [actions[value] for value in str(self._raw["actions"], "ascii").split("\n")]
+        self._actioncodes = {action: code for code, action in enumerate(self.actions)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._raw["kind"])
+
+    def __section(self, name: str, typecode: str):
+
+        raw = self._raw[name]
+        if self.numpy is not None:
+            return self.numpy.frombuffer(raw, dtype=self.numpy.dtype(typecode).newbyteorder("<"))
+
+        return raw.cast(typecode)
+
+    def close(self):
+        """Releases all views and unmaps the file. Memoryview sections must not be used
+        after close. NumPy arrays of sections still referenced by the caller stay valid,
+        the file is unmapped once the last of them is garbage collected."""
+        views = [view for views in (self.sections, self._raw) for view in views.values()
+            if isinstance(view, memoryview)]
+        self.sections = {}
+        self._raw = {}
+
+        try:
+            for view in views + [self._buffer]:
+                view.release()
+            self._mmap.close()
+        except BufferError:
+            # exported arrays keep references to the mapping, dropping ours defers the unmap
+            pass
+
+    def __string(self, code: int):
+
+        return None if code == NONE else self.strings[code]
+
+    def __action(self, code: int):
+
+        return None if code == NOACTION else self.actions[code]
+
+    def __positions(self, section: str, code: int):
+
+        values = self.sections[section]
+        if self.numpy is not None:
+            return self.numpy.flatnonzero(values == code)
+
+        return [idx for idx, value in enumerate(values) if value == code]
+
+    def __owners(self, section: str, startsection: str, code: int):
+        """Returns positions of entities owning at least one row of section equal to code."""
+        rows = self.__positions(section, code)
+        starts = self.sections[startsection]
+
+        if self.numpy is not None:
+            return self.numpy.unique(self.numpy.searchsorted(starts, rows, side="right") - 1)
+
+        owners = []
+        owner = 0
+        for row in rows:
+            while starts[owner + 1] <= row:
+                owner = owner + 1
+            if not owners or owners[-1] != owner:
+                owners.append(owner)
+        return owners
+
+    def select(self, table: Optional[str] = None, action=None, column: Optional[str] = None,
+            wherecolumn: Optional[str] = None):
+        """Returns sorted positions of entities matching all given filters: entity name,
+        SQLDDLAction or SQLDMLAction, name of some column and name of some column in where.
+        Names are compared exactly. NumPy array is returned when NumPy is used, list otherwise."""
+        selections = []
+
+        for value, lookup in ((table, lambda code: self.__positions("name", code)),
+                (column, lambda code: self.__owners("colname", "colstart", code)),
+                (wherecolumn, lambda code: self.__owners("wname", "wstart", code))):
+            if value is not None:
+                code = self._codes.get(value)
+                selections.append(lookup(code) if code is not None else [])
+
+        if action is not None:
+            code = self._actioncodes.get(action)
+            selections.append(self.__positions("action", code) if code is not None else [])
+
+        if not selections:
+            return self.numpy.arange(len(self)) if self.numpy is not None else list(range(len(self)))
+
+        if self.numpy is not None:
+            selected = self.numpy.asarray(selections[0], dtype=self.numpy.int64)
+            for other in selections[1:]:
+                selected = self.numpy.intersect1d(selected, other, assume_unique=True)
+            return selected
+
+        selected = set(selections[0]).intersection(*selections[1:])
+        return sorted(selected)
+
+    def __getitem__(self, position: int):
+        return self.entity(position)
+
+    def entities(self, positions: Optional[Iterable[int]] = None):
+        """Yields materialized entities at positions, all entities if positions is None."""
+        for position in range(len(self)) if positions is None else positions:
+            yield self.entity(int(position))
+
+    def __value(self, section: str, row: int):
+
+        offsets = self.sections[section]
+        return decode_value(self._raw[VALUEBLOBS[section]][offsets[row]:offsets[row + 1]])
+
+    def entity(self, position: int):
+        """Materializes SQLDatabase or SQLTable stored at position."""
+        sections = self.sections
+        kind = ENTITYKINDS[sections["kind"][position]]
+        name = self.__string(sections["name"][position])
+        action = self.__action(sections["action"][position])
+
+        if kind is SQLDatabase:
+            return SQLDatabase(name=name, action=action)
+
+        flags = sections["flags"][position]
+        columns = [self.__column(row)
+            for row in range(sections["colstart"][position], sections["colstart"][position + 1])]
+        where = self.__where(position)
+
+        return SQLTable(name=name, action=action,
+            columns=columns if flags & HASCOLUMNS else None,
+            where=where if flags & HASWHERE else None)
+
+    def __column(self, row: int):
+
+        sections = self.sections
+        constraints = [self.__constraint(conrow)
+            for conrow in range(sections["constart"][row], sections["constart"][row + 1])]
+
+        return SQLColumn(name=self.__string(sections["colname"][row]),
+            action=self.__action(sections["colact"][row]),
+            type=self.__string(sections["coltype"][row]),
+            size=self.__string(sections["colsize"][row]),
+            constraints=constraints if sections["colflags"][row] & HASCONSTRAINTS else None,
+            value=self.__value("colvalue", row))
+
+    def __constraint(self, row: int):
+
+        sections = self.sections
+        kind = CONSTRAINTKINDS[sections["conkind"][row]]
+        fields = dict(name=self.__string(sections["conname"][row]), action=self.__action(sections["conact"][row]))
+        if kind is SQLConstraintDefault:
+            fields["value"] = self.__value("convalue", row)
+
+        return kind(**fields)
+
+    def __where(self, position: int):
+
+        sections = self.sections
+        tree = self._raw["tree"][sections["tstart"][position]:sections["tstart"][position + 1]]
+        row = sections["wstart"][position]
+        stack: List[List] = [[]]
+        kinds: List[type] = []
+
+        for opcode in tree.tobytes():
+            match bytes((opcode,)):
+                case b"C":
+                    stack[-1].append(SQLColumn(name=self.__string(sections["wname"][row]),
+                        action=self.__action(sections["wact"][row]),
+                        type=None, size=None, constraints=None, value=self.__value("wvalue", row)))
+                    row = row + 1
+                case b")":
+                    condition = stack.pop()
+                    stack[-1].append(kinds.pop()(filter=condition))
+                case b"A":
+                    kinds.append(SQLAnd)
+                    stack.append([])
+                case b"O":
+                    kinds.append(SQLOr)
+                    stack.append([])
+
+        return stack[0]
@@ -0,0 +1,161 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Typed conversion of literal values in INSERT, UPDATE and WHERE clauses.
+
+Converter is chosen by the sqlparse token type of the literal and optionally
+by the column type declared in CREATE TABLE. Converters are cached per
+(token type, declared type) pair and applied to whole columns at once.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlparse.sql import Token
+import sqlparse.tokens as TType
+
+from .sqlentities import SQLTable
+
+
+LITERALTYPES = (TType.String.Single, TType.Number.Integer, TType.Number.Float)
+KEYWORDLITERALS = {"NULL": None, "TRUE": True, "FALSE": False}
+
+# range of numpy.int64, integer columns beyond it get object dtype
+INT64MIN = -2 ** 63
+INT64MAX = 2 ** 63 - 1
+
+INTEGERTYPES = {"int", "integer", "smallint", "bigint", "tinyint", "mediumint"}
+DECIMALTYPES = {"decimal", "numeric", "money"}
+FLOATTYPES = {"float", "real", "double"}
+BOOLEANTYPES = {"bool", "boolean"}
+DATETYPES = {"date"}
+DATETIMETYPES = {"datetime", "timestamp"}
+
+
+def isliteral(token: Token):
+    """Returns true if sqlparse.sql.Token is a string, number, NULL or boolean literal."""
+    return (token.ttype in LITERALTYPES
+        or (token.ttype in TType.Keyword and token.normalized in KEYWORDLITERALS)
+    )
+
+def unquote(value: str):
+    """Returns string literal without enclosing quotes and with unescaped inner quotes."""
+    return value[1:-1].replace("''", "'")
+
+def _toboolean(value: str):
+    return value.upper() in ("1", "TRUE", "T", "Y", "YES")
+
+TYPECONVERTERS = [
+    (INTEGERTYPES, int),
+    (DECIMALTYPES, Decimal),
+    (FLOATTYPES, float),
+    (BOOLEANTYPES, _toboolean),
+    (DATETYPES, date.fromisoformat),
+    (DATETIMETYPES, datetime.fromisoformat),
+]
+
+def _getdeclaredconverter(datatype: Optional[str]):
+
+    if datatype:
+        for datatypes, converter in TYPECONVERTERS:
+            if datatype.lower() in datatypes:
+                return converter
+
+    return None
+
+def _getstringconverter(declared):
+    """Returns converter of string literal to declared type, literal not matching
+    the declared type f.i. '01/05/2022' in date column stays unquoted string."""
+    def convert(value: str):
+        unquoted = unquote(value)
+        try:
+            return declared(unquoted)
+        except (ValueError, ArithmeticError):
+            return unquoted
+
+    return convert
+
+@lru_cache(maxsize=None)
+def getconverter(ttype, datatype: Optional[str] = None):
+    """Returns function converting the value of a literal token of type ttype
+    to python type. Declared column type datatype refines the conversion."""
+    declared = _getdeclaredconverter(datatype)
+
+    if ttype in TType.Keyword:
+        return lambda value: KEYWORDLITERALS[value.upper()]
+
+    if ttype == TType.String.Single:
+        if declared:
+            return _getstringconverter(declared)
+        return unquote
+
+    if ttype == TType.Number.Integer:
+        return declared if declared in (Decimal, float, _toboolean) else int
+
+    if ttype == TType.Number.Float:
+        return Decimal if declared is Decimal else float
+
+    return str
+
+def convert_value(token: Token, datatype: Optional[str] = None):
+    """Converts a single literal token to python type."""
+    return getconverter(token.ttype, datatype)(token.value)
+
+def convert_column(tokens: List[Token], datatype: Optional[str] = None):
+    """Converts literal tokens of one column to the list of python values."""
+    converters = {}
+    values = []
+
+    for token in tokens:
+        converter = converters.get(token.ttype)
+        if converter is None:
+            converter = converters[token.ttype] = getconverter(token.ttype, datatype)
+        values.append(converter(token.value))
+
+    return values
+
+def convert_columns(tokens: List[Token], width: int, datatypes: List[Optional[str]]):
+    """Converts row-ordered literal tokens of width columns to the list of columns,
+    each of them being the list of python values in row order."""
+    return [convert_column(tokens[idx::width], datatype) for idx, datatype in zip(range(width), datatypes)]
+
+def getdatatypes(schema, columnnames: List[Optional[str]]):
+    """Returns declared types of columnnames from schema. Schema is SQLTable created
+    from CREATE TABLE or dict of column name and type. Columns without names are
+    matched by position in schema."""
+    if schema is None:
+        return [None] * len(columnnames)
+
+    if isinstance(schema, SQLTable):
+        schematypes: Dict[str, str] = {column.name.lower(): column.type for column in schema.columns}
+    else:
+        schematypes = {name.lower(): datatype for name, datatype in schema.items()}
+
+    positional = list(schematypes.values())
+
+    return [schematypes.get(name.lower()) if name is not None
+        else (positional[idx] if idx < len(positional) else None)
+        for idx, name in enumerate(columnnames)]
+
+def toarray(values: List):
+    """Returns NumPy array of values. Integer, float and boolean columns get native
+    dtypes, columns with NULL, integers beyond int64 or other python types get object dtype."""
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError("NumPy is required for array values, install sqlstatement[numpy].") from error
+
+    types = set(map(type, values))
+    if types and types <= {bool}:
+        dtype = numpy.bool_
+    elif types and types <= {int} and all(INT64MIN <= value <= INT64MAX for value in values):
+        dtype = numpy.int64
+    elif types and types <= {int, float} and all(INT64MIN <= value <= INT64MAX for value in values
+            if type(value) is int):
+        dtype = numpy.float64
+    else:
+        dtype = object
+
+    return numpy.array(values, dtype=dtype)
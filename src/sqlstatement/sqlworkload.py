@@ -0,0 +1,368 @@
+# Copyright (c) 2022 SQL Statement author, see LICENSE file. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Synthetic SQL workload for capacity tests. SQLWorkloadGenerator emits a seeded,
+reproducible stream of every sql statement supported by SQLEntityFactory and
+SQLWorkloadHarness measures sustained throughput of parsing such a stream.
+
+Usage:
+generator = SQLWorkloadGenerator(SQLWorkloadConfig(seed=42))
+report: SQLWorkloadReport = SQLWorkloadHarness().run(generator.generate(1_000_000))
+
+Command line:
+$ python -m sqlstatement.sqlworkload --count 1000000 --seed 42
+$ python -m sqlstatement.sqlworkload --count 1000000 --seed 42 --fields name,action
+"""
+
+import argparse
+import random
+import time
+from collections import namedtuple, deque
+from typing import Dict, Iterable, List
+
+from .sql import SQLEntityFactory, SQLParseBudget
+from .sqlprofile import SQLProfiler
+
+
+SQLWorkloadConfig = namedtuple('SQLWorkloadConfig',
+    'seed kinds columns rows wheredepth literals repeatshare shapepool',
+    defaults=(
+        0,
+        {
+            "CREATEDATABASE": 1, "DROPDATABASE": 1, "CREATETABLE": 4, "DROPTABLE": 1,
+            "ALTERTABLEADD": 2, "ALTERTABLEMODIFYCOLUMN": 1, "ALTERTABLEMODIFYNOTNULL": 1,
+            "ALTERTABLEDROPCOLUMN": 1, "ALTERTABLEADDCONSTRAINTUNIQUE": 1,
+            "ALTERTABLEADDCONSTRAINTPRIMARYKEY": 1, "ALTERTABLEDROPCONSTRAINT": 1,
+            "INSERTINTO": 30, "UPDATESET": 15, "SELECTFROM": 30, "DELETEFROM": 10
+        },
+        (2, 8),
+        (1, 1),
+        (0, 3),
+        {"string": 3, "integer": 2},
+        0.5,
+        1000
+    )
+)
+SQLWorkloadConfig.__doc__ = """Distributions of the generated workload.
+
+    kinds: relative weight of every statement kind (keys of sql.SQLProcessor)
+    columns, rows, wheredepth: inclusive (min, max) ranges drawn uniformly
+    literals: relative weight of literal types "string", "integer", "float" and "null"
+    repeatshare: share of statements reusing a shape (kind, names, structure) emitted before
+    shapepool: number of recent shapes kept for reuse
+    """
+
+SQLWorkloadSample = namedtuple('SQLWorkloadSample',
+    'seconds statements statementspersecond rss')
+SQLWorkloadReport = namedtuple('SQLWorkloadReport',
+    'statements errors bytes seconds statementspersecond megabytespersecond latencies samples')
+
+SQLShape = namedtuple('SQLShape', 'kind table columns types rows where')
+
+DATATYPES = ["int", "varchar", "date", "integer"]
+CONSTRAINTS = ["", "", "", " NOT NULL", " UNIQUE", " UNIQUE NOT NULL"]
+
+
+class SQLWorkloadGenerator:
+
+    """Seeded generator of sql statement strings.
+
+    Shape of every statement (kind, table and column names, where tree) is drawn from
+    the distributions in SQLWorkloadConfig. Literal values are drawn for every statement
+    so repeated shapes still produce distinct statement strings.
+    """
+
+    def __init__(self, config: SQLWorkloadConfig = SQLWorkloadConfig()):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._kinds = list(config.kinds.keys())
+        self._kindweights = list(config.kinds.values())
+        self._literals = list(config.literals.keys())
+        self._literalweights = list(config.literals.values())
+        self._shapes = deque(maxlen=config.shapepool)
+
+        self._render = {
+            "CREATEDATABASE": lambda s: f"CREATE DATABASE {s.table};",
+            "DROPDATABASE": lambda s: f"DROP DATABASE {s.table};",
+            "CREATETABLE": self.__render_createtable,
+            "DROPTABLE": lambda s: f"DROP TABLE {s.table};",
+            "ALTERTABLEADD": lambda s: f"ALTER TABLE {s.table} ADD {self.__render_columndefs(s)};",
+            "ALTERTABLEMODIFYCOLUMN": lambda s: f"ALTER TABLE {s.table} MODIFY COLUMN {s.columns[0]} {s.types[0]};",
+            "ALTERTABLEMODIFYNOTNULL": lambda s: f"ALTER TABLE {s.table} MODIFY {s.columns[0]} int NOT NULL;",
+            "ALTERTABLEDROPCOLUMN": lambda s: f"ALTER TABLE {s.table} DROP COLUMN {s.columns[0]};",
+            "ALTERTABLEADDCONSTRAINTUNIQUE": lambda s:
+                f"ALTER TABLE {s.table} ADD CONSTRAINT UC_{s.table} UNIQUE ({','.join(s.columns)});",
+            "ALTERTABLEADDCONSTRAINTPRIMARYKEY": lambda s:
+                f"ALTER TABLE {s.table} ADD CONSTRAINT PK_{s.table} PRIMARY KEY ({','.join(s.columns)});",
+            "ALTERTABLEDROPCONSTRAINT": lambda s: f"ALTER TABLE {s.table} DROP CONSTRAINT UC_{s.table};",
+            "INSERTINTO": self.__render_insert,
+            "UPDATESET": self.__render_update,
+            "SELECTFROM": lambda s: f"SELECT {', '.join(s.columns)} FROM {s.table}{self.__render_where(s)};",
+            "DELETEFROM": lambda s: f"DELETE FROM {s.table}{self.__render_where(s)};"
+        }
+
+        unsupported = set(self._kinds) - set(self._render.keys())
+        if unsupported:
+            raise ValueError(f"Unsupported statement kinds: {sorted(unsupported)}")
+
+    def generate(self, count: int):
+        """Yields count sql statement strings."""
+        for _ in range(count):
+            shape = self.__getshape()
+            yield self._render[shape.kind](shape)
+
+    def __getshape(self):
+
+        if self._shapes and self._random.random() < self.config.repeatshare:
+            shape = self._random.choice(self._shapes)
+        else:
+            shape = self.__create_shape()
+            self._shapes.append(shape)
+
+        return shape
+
+    def __create_shape(self):
+
+        rnd = self._random
+        kind = rnd.choices(self._kinds, self._kindweights)[0]
+        table = f"table{rnd.randrange(10_000)}"
+        columns = [f"column{idx}" for idx in rnd.sample(range(1_000), rnd.randint(*self.config.columns))]
+        types = [rnd.choice(DATATYPES) for _ in columns]
+
+        return SQLShape(kind=kind, table=table, columns=columns, types=types,
+            rows=rnd.randint(*self.config.rows),
+            where=self.__create_where(rnd.randint(*self.config.wheredepth)))
+
+    def __create_where(self, depth: int):
+        """Returns where tree as list of (operator, condition) where condition is
+        either (column, comparison, literal type) or nested list."""
+        if depth <= 0:
+            return []
+
+        rnd = self._random
+        conditions = []
+        for idx in range(rnd.randint(1, 3)):
+            operator = rnd.choice(["AND", "OR"]) if idx else ""
+            if depth > 1 and rnd.random() < 0.5:
+                conditions.append((operator, self.__create_where(depth - 1)))
+            else:
+                conditions.append((operator, (f"column{rnd.randrange(1_000)}",
+                    rnd.choice(["=", "=", "LIKE"]), rnd.choices(self._literals, self._literalweights)[0])))
+
+        return conditions
+
+    def __literal(self, literaltype: str, like: bool = False):
+
+        rnd = self._random
+        match literaltype:
+            case "string":
+                value = f"value{rnd.randrange(1_000_000)}"
+                return f"'%{value}%'" if like else f"'{value}'"
+            case "integer":
+                return str(rnd.randrange(1_000_000))
+            case "float":
+                return f"{rnd.uniform(0, 1_000_000):.2f}"
+            case "null":
+                return "NULL"
+            case _:
+                raise ValueError(f"Unsupported literal type: {literaltype}")
+
+    def __render_columndefs(self, shape: SQLShape):
+
+        return ", ".join(map(
+                lambda column: f"{column[0]} {column[1]}{'(255)' if column[1] == 'varchar' else ''}"
+                    f"{self._random.choice(CONSTRAINTS)}",
+                zip(shape.columns, shape.types)
+            )
+        )
+
+    def __render_createtable(self, shape: SQLShape):
+
+        return f"CREATE TABLE {shape.table} ({self.__render_columndefs(shape)});"
+
+    def __render_values(self, shape: SQLShape):
+
+        return ", ".join(map(lambda _: self.__literal(
+            self._random.choices(self._literals, self._literalweights)[0]), shape.columns))
+
+    def __render_insert(self, shape: SQLShape):
+
+        rows = ", ".join(f"({self.__render_values(shape)})" for _ in range(shape.rows))
+        return f"INSERT INTO {shape.table} ({', '.join(shape.columns)}) VALUES {rows};"
+
+    def __render_update(self, shape: SQLShape):
+
+        assignments = ", ".join(map(lambda column: column + "=" + self.__literal(
+            self._random.choices(self._literals, self._literalweights)[0]), shape.columns))
+        return f"UPDATE {shape.table} SET {assignments}{self.__render_where(shape)};"
+
+    def __render_conditions(self, conditions: List):
+
+        rendered = []
+        for operator, condition in conditions:
+            if isinstance(condition, list):
+                text = f"( {self.__render_conditions(condition)} )"
+            else:
+                column, comparison, literaltype = condition
+                like = comparison == "LIKE"
+                text = (f"{column} LIKE {self.__literal('string', like)}" if like
+                    else f"{column}={self.__literal(literaltype)}")
+            rendered.append(f"{operator} {text}" if operator else text)
+
+        return " ".join(rendered)
+
+    def __render_where(self, shape: SQLShape):
+
+        if not shape.where:
+            return ""
+
+        return f" WHERE {self.__render_conditions(shape.where)}"
+
+
+def getrss():
+    """Returns resident set size of the current process in bytes.
+    Peak resident set size is returned where /proc is not available,
+    0 where the resource module is not available either (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SQLWorkloadHarness:
+
+    """Streams sql statements through SQLEntityFactory and measures throughput.
+
+    Latencies are collected in a histogram with power of two buckets in microseconds,
+    so the memory used by the harness does not grow with the workload size.
+    Options are passed to create_entity, f.i. fields={"name", "action"} benchmarks
+    header-only parses. Every interval statements a SQLWorkloadSample with the throughput of the last
+    interval and the resident set size is recorded to spot leaks and throughput decay.
+    """
+
+    def __init__(self, interval: int = 100_000, factory=SQLEntityFactory, **options):
+        self.interval = interval
+        self.factory = factory
+        self.options = options
+
+    def run(self, statements: Iterable[str]):
+        """Parses all statements and returns SQLWorkloadReport."""
+        latencies: Dict[int, int] = {}
+        samples: List[SQLWorkloadSample] = []
+        count = errors = size = 0
+
+        clock = time.perf_counter
+        start = intervalstart = clock()
+        for sql in statements:
+            begin = clock()
+            try:
+                self.factory.create_entity(sql, **self.options)
+            except Exception:
+                errors = errors + 1
+            elapsed = clock() - begin
+
+            bucket = 1 << max(int(elapsed * 1_000_000), 1).bit_length()
+            latencies[bucket] = latencies.get(bucket, 0) + 1
+            count = count + 1
+            size = size + len(sql.encode())
+
+            if count % self.interval == 0:
+                now = clock()
+                samples.append(SQLWorkloadSample(seconds=now - start, statements=count,
+                    statementspersecond=self.interval / (now - intervalstart), rss=getrss()))
+                intervalstart = now
+
+        seconds = clock() - start
+        return SQLWorkloadReport(statements=count, errors=errors, bytes=size, seconds=seconds,
+            statementspersecond=count / seconds if seconds else 0.0,
+            megabytespersecond=size / seconds / 1_000_000 if seconds else 0.0,
+            latencies=dict(sorted(latencies.items())), samples=samples)
+
+
+def percentile(latencies: Dict[int, int], share: float):
+    """Returns upper bound in microseconds of the histogram bucket containing the percentile."""
+    total = sum(latencies.values())
+    seen = 0
+    for bucket, count in sorted(latencies.items()):
+        seen = seen + count
+        if seen >= total * share:
+            return bucket
+
+    return None
+
+def format_report(report: SQLWorkloadReport):
+    """Returns human readable summary of SQLWorkloadReport."""
+    lines = [
+        f"statements: {report.statements} (errors: {report.errors})",
+        f"throughput: {report.statementspersecond:.0f} statements/s, {report.megabytespersecond:.2f} MB/s",
+        "latency: " + ", ".join(f"p{int(share * 100)} <= {percentile(report.latencies, share)}us"
+            for share in (0.5, 0.9, 0.99)),
+        "histogram:"
+    ]
+    lines.extend(f"  <= {bucket:>8}us: {count}" for bucket, count in report.latencies.items())
+    lines.append("samples:")
+    lines.extend(f"  {sample.seconds:8.1f}s {sample.statements:>12} {sample.statementspersecond:10.0f}/s "
+        f"rss {sample.rss / 1_000_000:.1f}MB" for sample in report.samples)
+
+    return "\n".join(lines)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Parse synthetic sql workload and report throughput.")
+    parser.add_argument("--count", type=int, default=100_000, help="number of statements")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator")
+    parser.add_argument("--interval", type=int, default=10_000, help="statements between samples")
+    parser.add_argument("--repeatshare", type=float, default=0.5, help="share of repeated shapes")
+    parser.add_argument("--wheredepth", type=int, default=3, help="maximal depth of where clause")
+    parser.add_argument("--fields", default=None,
+        help="comma separated projection of entity fields, f.i. name,action")
+    parser.add_argument("--maxbytes", type=int, default=None, help="budget of statement size in bytes")
+    parser.add_argument("--maxtokens", type=int, default=None, help="budget of tokens per statement")
+    parser.add_argument("--maxwheredepth", type=int, default=None, help="budget of where nesting")
+    parser.add_argument("--maxseconds", type=float, default=None, help="budget of seconds per statement")
+    parser.add_argument("--profile", default=None,
+        help="profile parsing functions, print summary and write collapsed stacks to the file")
+    args = parser.parse_args()
+
+    options = {}
+    if args.fields:
+        options["fields"] = set(args.fields.split(","))
+
+    limits = dict(maxbytes=args.maxbytes, maxtokens=args.maxtokens, maxwheredepth=args.maxwheredepth,
+        maxseconds=args.maxseconds)
+    if any(limit is not None for limit in limits.values()):
+        options["budget"] = SQLParseBudget(**limits)
+
+    config = SQLWorkloadConfig(seed=args.seed, repeatshare=args.repeatshare,
+        wheredepth=(0, args.wheredepth))
+    harness = SQLWorkloadHarness(interval=args.interval, **options)
+    statements = SQLWorkloadGenerator(config).generate(args.count)
+    if args.profile:
+        with SQLProfiler() as profiler:
+            report = harness.run(statements)
+        with open(args.profile, "w") as out:
+            profiler.write_collapsed(out)
+    else:
+        report = harness.run(statements)
+    print(format_report(report))
+
+    if args.profile:
+        print("profile:")
+        print(profiler.format_summary(limit=15, bykind=False, bysize=False))
+
+    if "budget" in options:
+        print("budget hits:")
+        for (kind, limit), count in sorted(options["budget"].hits.items(), key=str):
+            print(f"  {kind or 'UNKNOWN'} {limit}: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,17 @@
 import unittest
+from datetime import date
+from decimal import Decimal
 from typing import List, Tuple
 from src.sqlstatement.sql import SQLEntityFactory
 from src.sqlstatement.sqlentities import (SQLDatabase, SQLTable, SQLColumn, SQLConstraint,
     SQLConstraintNotNull, SQLConstraintPrimaryKey, SQLConstraintUnique, SQLAnd, SQLOr)
 from src.sqlstatement.sqlactions import SQLDDLAction, SQLDMLAction
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class SampleSQL:
 
     CREATEDB  = "CREATE DATABASE testDB;"
@@ -136,6 +143,25 @@ class SampleSQL:
         (SQLAnd, [("CustomerName", "Alfreds Futterkiste", SQLDMLAction.WHEREEQUAL)]),
     ]
 
+    TYPEDSCHEMA = "CREATE TABLE Orders (OrderID int, Amount decimal, Shipped date, Note varchar(255));"
+    INSERTTYPED = "INSERT INTO Orders (OrderID, Amount, Shipped, Note) VALUES (1, 10.5, '2022-05-01', 'it''s'), (2, 3, NULL, 'fast');"
+    INSERTTYPEDEXPECTED = [
+        ("OrderID", [1, 2], SQLDMLAction.INSERT),
+        ("Amount", [Decimal("10.5"), Decimal("3")], SQLDMLAction.INSERT),
+        ("Shipped", [date(2022, 5, 1), None], SQLDMLAction.INSERT),
+        ("Note", ["it's", "fast"], SQLDMLAction.INSERT)
+    ]
+
+    UPDATETYPED = "UPDATE Orders SET Amount=1.5, Note=NULL WHERE OrderID=7 AND Note='old';"
+    UPDATETYPEDEXPECTED = [
+        ("Amount", 1.5, SQLDMLAction.UPDATE),
+        ("Note", None, SQLDMLAction.UPDATE)
+    ]
+    WHERETYPEDEXPECTED = [
+        (SQLAnd, [("OrderID", 7, SQLDMLAction.WHEREEQUAL)]),
+        (SQLAnd, [("Note", "old", SQLDMLAction.WHEREEQUAL)]),
+    ]
+
 class TestSQLParse(unittest.TestCase):
 
     def test_parsecreatedb(self):
@@ -249,6 +275,81 @@ class TestSQLParse(unittest.TestCase):
 
         self.assert_where(sqlentity.where, SampleSQL.DELETEWHEREEXPECTED)
 
+    def test_inserttyped(self):
+        schema: SQLTable = SQLEntityFactory.create_entity(SampleSQL.TYPEDSCHEMA)
+        sqlentity: SQLTable = SQLEntityFactory.create_entity(SampleSQL.INSERTTYPED, typed=True, schema=schema)
+
+        self.assert_entity(sqlentity, SQLTable, "Orders", SQLDMLAction.INSERT)
+        self.assert_lists(self.assert_columndata, sqlentity.columns, SampleSQL.INSERTTYPEDEXPECTED)
+
+    def test_updatetyped(self):
+        sqlentity: SQLTable = SQLEntityFactory.create_entity(SampleSQL.UPDATETYPED, typed=True)
+
+        self.assert_entity(sqlentity, SQLTable, "Orders", SQLDMLAction.UPDATE)
+        self.assert_lists(self.assert_columndata, sqlentity.columns, SampleSQL.UPDATETYPEDEXPECTED)
+
+        self.assert_where(sqlentity.where, SampleSQL.WHERETYPEDEXPECTED)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_typedarrays(self):
+        sql = "INSERT INTO t (a, b, c) VALUES (1, 1, 1.5), (2, 99999999999999999999, 2);"
+        sqlentity: SQLTable = SQLEntityFactory.create_entity(sql, typed=True, arrays=True)
+
+        self.assertEqual([column.value.dtype for column in sqlentity.columns],
+            [numpy.int64, numpy.dtype(object), numpy.float64])
+        self.assertEqual(sqlentity.columns[1].value[1], 99999999999999999999)
+
+    def test_typedwithoutvalues(self):
+        for sql in ["INSERT INTO t (a) VALUES (1)", "UPDATE t SET a=b WHERE c=1"]:
+            untyped: SQLTable = SQLEntityFactory.create_entity(sql)
+            sqlentity: SQLTable = SQLEntityFactory.create_entity(sql, typed=True)
+
+            self.assertEqual(sqlentity.columns, untyped.columns)
+
+    def test_typedmismatch(self):
+        schema: SQLTable = SQLEntityFactory.create_entity(SampleSQL.TYPEDSCHEMA)
+        sql = "INSERT INTO Orders (OrderID, Amount, Shipped) VALUES (1, 'n/a', '01/05/2022');"
+        sqlentity: SQLTable = SQLEntityFactory.create_entity(sql, typed=True, schema=schema)
+
+        self.assertEqual([column.value for column in sqlentity.columns], [1, "n/a", "01/05/2022"])
+
+    def test_projectionheader(self):
+        samples = [(SampleSQL.CREATEDB, SQLDatabase, "testDB", SQLDDLAction.CREATE),
+            (SampleSQL.ADDPRIMARYKEY, SQLTable, "Persons", SQLDDLAction.ADDCONSTRAINT),
+            (SampleSQL.ADDNOTNULL, SQLTable, "Persons", SQLDDLAction.ADDCONSTRAINT),
+            (SampleSQL.ALTERTABLEDROP, SQLTable, "Persons", SQLDDLAction.ALTER),
+            (SampleSQL.INSERTINTOWCOLS, SQLTable, "Customers", SQLDMLAction.INSERT),
+            (SampleSQL.UPDATEMULTI, SQLTable, "Customers", SQLDMLAction.UPDATE),
+            (SampleSQL.SELECTFROM, SQLTable, "Customers", SQLDMLAction.SELECT)]
+
+        for sql, enttype, name, action in samples:
+            sqlentity = SQLEntityFactory.create_entity(sql, fields={"name", "action"})
+
+            self.assert_entity(sqlentity, enttype, name, action)
+            if enttype is SQLTable:
+                self.assertIsNone(sqlentity.columns)
+                self.assertIsNone(sqlentity.where)
+
+    def test_projectionwhere(self):
+        sqlentity: SQLTable = SQLEntityFactory.create_entity(SampleSQL.SELECTFROM, fields={"name", "action", "where"})
+
+        self.assert_entity(sqlentity, SQLTable, "Customers", SQLDMLAction.SELECT)
+        self.assertIsNone(sqlentity.columns)
+        self.assert_where(sqlentity.where, SampleSQL.WHEREEXPECTED)
+
+    def test_projectionname(self):
+        sql = "SELECT CustomerName FROM Customers WHERE Country='Mexico';"
+
+        for fields in [{"name", "action"}, {"name", "action", "where"}, None]:
+            self.assertEqual(SQLEntityFactory.create_entity(sql, fields=fields).name, "Customers")
+
+        sql = "INSERT INTO Customers SELECT CustomerName FROM Suppliers;"
+        self.assertEqual(SQLEntityFactory.create_entity(sql, fields={"name", "action"}).name, "Customers")
+        self.assertRaises(KeyError, SQLEntityFactory.create_entity, sql)
+
+    def test_projectionunknownfield(self):
+        self.assertRaises(ValueError, SQLEntityFactory.create_entity, SampleSQL.DELETEFROM, fields={"name", "values"})
+
     def assert_entity(self, sqlentity, enttype:type, name: str, action: SQLDDLAction):
         self.assertIsInstance(sqlentity, enttype)
         self.assertEqual(sqlentity.name, name, 'Name check failed.')
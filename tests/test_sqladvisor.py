@@ -0,0 +1,71 @@
+import unittest
+from src.sqlstatement.sqladvisor import SQLIndexAdvisor, getconjunctions
+from src.sqlstatement.sql import SQLEntityFactory
+from tests.test_sql import SampleSQL
+
+class SampleLog:
+
+    STATEMENTS = [
+        "CREATE TABLE Customers (CustomerID int, Country varchar(255), City varchar(255));",
+        "ALTER TABLE Customers ADD CONSTRAINT PK_Customer PRIMARY KEY (CustomerID);",
+        "SELECT CustomerName, City FROM Customers WHERE Country='Mexico' AND City='Monterrey';",
+        "SELECT CustomerName, City FROM Customers WHERE City='Oslo' AND Country='Norway';",
+        "DELETE FROM Customers WHERE Country='Mexico';",
+        "UPDATE Customers SET City='Oslo' WHERE CustomerID=1;",
+        "SELECT CustomerName, City FROM Customers WHERE ContactName LIKE '%Juan%';",
+        "SELECT CustomerName, City FROM Orders WHERE Note LIKE 'fast%';",
+        "INSERT INTO Customers (CustomerName, City) VALUES ('Cardinal', 'Oslo');",
+        "NOT A STATEMENT",
+    ]
+
+class TestSQLIndexAdvisor(unittest.TestCase):
+
+    def test_conjunctions(self):
+        sqlentity = SQLEntityFactory.create_entity(SampleSQL.SELECTFROM)
+
+        # Country AND City LIKE '%..' AND (ContactName OR ContactName): LIKE with leading % is skipped
+        self.assertEqual([set(group) for group in getconjunctions(sqlentity.where)], [{"country", "contactname"}])
+
+    def test_recommend(self):
+        advisor = SQLIndexAdvisor()
+        advisor.consume_sql(SampleLog.STATEMENTS)
+
+        candidates = advisor.recommend()
+
+        self.assertEqual(advisor.errors, 1)
+        self.assertEqual(candidates[0].table, "customers")
+        self.assertEqual(candidates[0].columns, ("country", "city"))
+        self.assertEqual(candidates[0].count, 3)
+        self.assertNotIn(("customers", ("customerid",)), [(c.table, c.columns) for c in candidates])
+        self.assertIn(("orders", ("note",)), [(c.table, c.columns) for c in candidates])
+
+    def test_singlecolumnselect(self):
+        advisor = SQLIndexAdvisor()
+        advisor.consume_sql(["SELECT name FROM persons WHERE city='x';"])
+
+        self.assertEqual([(c.table, c.columns) for c in advisor.recommend()], [("persons", ("city",))])
+
+    def test_existingconstraint(self):
+        advisor = SQLIndexAdvisor()
+        advisor.consume_sql(SampleLog.STATEMENTS[1:3])
+        advisor.consume_sql(["ALTER TABLE Customers ADD CONSTRAINT UC_Location UNIQUE (City,Country);"])
+
+        self.assertEqual(advisor.recommend(), [])
+
+        advisor.consume_sql(["ALTER TABLE Customers DROP CONSTRAINT UC_Location;"])
+
+        self.assertEqual(len(advisor.recommend()), 1)
+
+    def test_boundedmemory(self):
+        advisor = SQLIndexAdvisor(maxcandidates=4)
+        for idx in range(100):
+            advisor.consume_sql([f"DELETE FROM Orders WHERE OrderID=1 AND Column{idx}=2;",
+                "DELETE FROM Orders WHERE OrderID=1;"])
+
+        self.assertLessEqual(len(advisor._counts), 4)
+        self.assertLessEqual(max(len(value) for value in vars(advisor).values() if isinstance(value, dict)), 4)
+        self.assertEqual(advisor.recommend(limit=1)[0].columns[0], "orderid")
+
+
+if __name__ == '__main__':
+    unittest.main()
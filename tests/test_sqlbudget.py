@@ -0,0 +1,101 @@
+import unittest
+from sqlparse import parse
+from src.sqlstatement.sql import SQLEntityFactory, SQLParseBudget, SQLBudgetError
+from src.sqlstatement.sqlactions import SQLDMLAction
+from src.sqlstatement.sqlworkload import (SQLWorkloadGenerator, SQLWorkloadConfig, SQLWorkloadHarness,
+    percentile)
+from tests.test_sql import SampleSQL
+
+class SampleAdversarial:
+
+    """Statements stalling the parser without budget: huge, token heavy, deeply
+    nested, unterminated or garbage input."""
+
+    MANYCONDITIONS = "SELECT a, b FROM t WHERE " + " AND ".join(f"c{i}='{i}'" for i in range(1500)) + ";"
+    NESTEDWHERE = "SELECT a, b FROM t WHERE " + "(" * 300 + "a='1'" + ")" * 300 + ";"
+    MANYCONSTRAINTS = "CREATE TABLE t (" + ", ".join(f"c{i} int NOT NULL UNIQUE" for i in range(1000)) + ");"
+    MANYROWS = "INSERT INTO t (a, b) VALUES " + ", ".join(f"({i}, 'x{i}')" for i in range(3000)) + ";"
+    LONGSTRING = "INSERT INTO t (a, b) VALUES (1, '" + "x" * 2_000_000 + "');"
+    UNTERMINATED = "SELECT a, b FROM t WHERE a='" + "x " * 100_000 + ";"
+    GARBAGE = "(((( ;;; '' \" SELECT " * 2000
+
+    CORPUS = [MANYCONDITIONS, NESTEDWHERE, MANYCONSTRAINTS, MANYROWS, LONGSTRING, UNTERMINATED, GARBAGE]
+
+class TestSQLParseBudget(unittest.TestCase):
+
+    def createbudget(self, **limits):
+        return SQLParseBudget(**dict(dict(maxbytes=65536, maxtokens=2000, maxwheredepth=16), **limits))
+
+    def test_withinbudget(self):
+        budget = self.createbudget(maxseconds=10)
+
+        for sql in [SampleSQL.SELECTFROM, SampleSQL.INSERTINTOWCOLS, SampleSQL.ADDPRIMARYKEY]:
+            self.assertEqual(SQLEntityFactory.create_entity(sql, budget=budget), SQLEntityFactory.create_entity(sql))
+        self.assertEqual(budget.hits, {})
+
+    def test_exceeded(self):
+        budget = self.createbudget()
+
+        for sql, limit, kind in [(SampleAdversarial.LONGSTRING, "maxbytes", "INSERTINTO"),
+                (SampleAdversarial.MANYCONDITIONS, "maxtokens", "SELECTFROM"),
+                (SampleAdversarial.NESTEDWHERE, "maxwheredepth", "SELECTFROM"),
+                (SampleAdversarial.GARBAGE, "maxtokens", None)]:
+            with self.assertRaises(SQLBudgetError) as context:
+                SQLEntityFactory.create_entity(sql, budget=budget)
+
+            self.assertEqual((context.exception.limit, context.exception.kind), (limit, kind))
+
+        self.assertEqual(budget.hits, {("INSERTINTO", "maxbytes"): 1, ("SELECTFROM", "maxtokens"): 1,
+            ("SELECTFROM", "maxwheredepth"): 1, (None, "maxtokens"): 1})
+
+    def test_wheredepthsubquery(self):
+        budget = self.createbudget(maxwheredepth=1)
+        sql = "SELECT a, b FROM t WHERE a IN (SELECT a FROM s) AND (b='2');"
+
+        SQLEntityFactory.create_entity(sql, fields={"name", "action"}, budget=budget)
+        self.assertRaises(SQLBudgetError, SQLEntityFactory.create_entity,
+            sql.replace("(b='2')", "((b='2'))"), budget=budget)
+
+    def test_deadline(self):
+        budget = SQLParseBudget(maxseconds=0)
+
+        with self.assertRaises(SQLBudgetError) as context:
+            SQLEntityFactory.create_entity(SampleSQL.UPDATEMULTI, budget=budget)
+
+        self.assertEqual((context.exception.limit, context.exception.kind), ("maxseconds", "UPDATE"))
+        self.assertRaises(TypeError, SQLEntityFactory.create_entity, SampleSQL.UPDATEMULTI, deadline=0)
+
+    def test_degrade(self):
+        budget = self.createbudget(degrade=True)
+
+        sqlentity = SQLEntityFactory.create_entity(SampleAdversarial.MANYROWS, budget=budget)
+
+        self.assertEqual((sqlentity.name, sqlentity.action, sqlentity.columns), ("t", SQLDMLAction.INSERT, None))
+        self.assertRaises(SQLBudgetError, SQLEntityFactory.create_entity, SampleAdversarial.GARBAGE, budget=budget)
+        self.assertEqual(budget.hits, {("INSERTINTO", "maxtokens"): 1, (None, "maxtokens"): 1})
+
+    def test_fromstatement(self):
+        budget = self.createbudget(maxtokens=5, maxseconds=10, degrade=True)
+        statement = parse(SampleSQL.INSERTINTOWCOLS)[0]
+
+        sqlentity = SQLEntityFactory.create_entity_from_statement(statement, budget=budget)
+
+        self.assertEqual((sqlentity.action, sqlentity.columns), (SQLDMLAction.INSERT, None))
+        self.assertEqual(budget.hits, {("INSERTINTO", "maxtokens"): 1})
+        self.assertRaises(SQLBudgetError, SQLEntityFactory.create_entity_from_statement,
+            parse(SampleSQL.UPDATEMULTI)[0], budget=SQLParseBudget(maxseconds=0))
+
+    def test_adversarialp99(self):
+        budget = self.createbudget(maxseconds=0.05, degrade=True)
+        statements = list(SQLWorkloadGenerator(SQLWorkloadConfig(seed=5)).generate(200))
+        statements.extend(SampleAdversarial.CORPUS * 3)
+
+        report = SQLWorkloadHarness(budget=budget).run(statements)
+
+        # unbounded, the slowest statements of the corpus take seconds each
+        self.assertLessEqual(percentile(report.latencies, 0.99), 262_144)
+        self.assertEqual(sum(budget.hits.values()), len(SampleAdversarial.CORPUS) * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
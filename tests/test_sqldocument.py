@@ -0,0 +1,103 @@
+import random
+import unittest
+from src.sqlstatement.sqldocument import SQLDocument
+from src.sqlstatement.sqlentities import SQLTable
+from src.sqlstatement.sqlactions import SQLDMLAction
+
+class SampleScript:
+
+    SCRIPT = ("SELECT CustomerName, City FROM Customers WHERE Country='Mexico';\n"
+        "DELETE FROM Orders WHERE OrderID=1;\n"
+        "UPDATE Customers SET City='Oslo' WHERE CustomerID=1;\n")
+
+class TestSQLDocument(unittest.TestCase):
+
+    def test_parsescript(self):
+        document = SQLDocument(SampleScript.SCRIPT)
+
+        self.assertEqual([entity.name for entity in document.entities], ["Customers", "Orders", "Customers"])
+        self.assertEqual("".join(statement.text for statement in document.statements), SampleScript.SCRIPT)
+
+    def test_editreusesuntouchedentities(self):
+        document = SQLDocument(SampleScript.SCRIPT)
+        before = document.entities
+
+        offset = SampleScript.SCRIPT.index("Orders")
+        change = document.edit(offset, len("Orders"), "Invoices")
+
+        after = document.entities
+        self.assertIs(after[0], before[0])
+        self.assertIs(after[2], before[2])
+        self.assertEqual(after[1].name, "Invoices")
+        self.assertEqual(change.index, 1)
+        self.assertEqual(change.removed, [before[1]])
+        self.assertEqual(change.added, [after[1]])
+        self.assertEqual(document.text, SampleScript.SCRIPT.replace("Orders", "Invoices"))
+
+    def test_editwhitespacenochange(self):
+        document = SQLDocument(SampleScript.SCRIPT)
+
+        change = document.edit(SampleScript.SCRIPT.index("DELETE"), 0, "  ")
+
+        self.assertEqual(change.removed, [])
+        self.assertEqual(change.added, [])
+
+    def test_editremovesemicolon(self):
+        document = SQLDocument(SampleScript.SCRIPT)
+
+        offset = SampleScript.SCRIPT.index(";\nDELETE")
+        document.edit(offset, 1, "")
+
+        self.assertEqual(len(document.entities) + len([s for s in document.statements if s.error]), 2)
+        self.assertEqual(document.entities[-1].action, SQLDMLAction.UPDATE)
+
+    def test_editsplitsstatement(self):
+        document = SQLDocument("DELETE FROM Orders WHERE OrderID=1;")
+
+        change = document.edit(len("DELETE FROM Orders WHERE OrderID=1;"), 0, "\nDROP TABLE Persons;")
+
+        self.assertEqual(len(document.entities), 2)
+        self.assertIsInstance(change.added[0], SQLTable)
+        self.assertEqual(change.added[0].name, "Persons")
+
+    def test_editopenscomment(self):
+        document = SQLDocument("SELECT a FROM b;\nSELECT c FROM d;\n/* x */ DROP TABLE e;")
+
+        document.edit(7, 0, "/*")
+
+        parsed = SQLDocument(document.text)
+        self.assertEqual([s.text for s in document.statements], [s.text for s in parsed.statements])
+        self.assertEqual(len(document.statements), 1)
+
+    def test_editdollarquote(self):
+        document = SQLDocument("SELECT a FROM b;\nSELECT c FROM d;")
+
+        document.edit(0, 0, "$$")
+        document.edit(20, 0, "$$")
+
+        parsed = SQLDocument(document.text)
+        self.assertEqual([s.text for s in document.statements], [s.text for s in parsed.statements])
+
+    def test_editequalsparse(self):
+        pieces = ["'", '"', "/*", "*/", "$$", "$a$", ";", "\n", "--", " ", "x", "SELECT 1;", ""]
+        rng = random.Random(26)
+
+        for _ in range(100):
+            document = SQLDocument(SampleScript.SCRIPT * 2 + "/* x */ DROP TABLE e;\n")
+            for _ in range(3):
+                offset = rng.randint(0, len(document.text))
+                length = rng.randint(0, min(3, len(document.text) - offset))
+                document.edit(offset, length, rng.choice(pieces))
+
+            parsed = SQLDocument(document.text)
+            self.assertEqual([(s.text, s.entity, s.unclosed) for s in document.statements],
+                [(s.text, s.entity, s.unclosed) for s in parsed.statements], document.text)
+
+    def test_editoutofbounds(self):
+        document = SQLDocument(SampleScript.SCRIPT)
+
+        self.assertRaises(ValueError, document.edit, len(SampleScript.SCRIPT), 1, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from src.sqlstatement.sqllineage import SQLLineageGraph, getlineage, getscriptlineage
+
+class SampleLineage:
+
+    INSERTSELECTJOIN = """INSERT INTO Sales.Report (Name, Total)
+        SELECT p.Name, o.Total FROM Persons p INNER JOIN Sales.Orders AS o ON p.ID = o.PersonID
+        WHERE o.Total IN (SELECT Total FROM Limits);"""
+    UPDATEALIAS = "UPDATE p SET City='Oslo' FROM Persons p JOIN Moves m ON p.ID = m.PersonID;"
+    WITHCTE = """WITH recent AS (SELECT ID FROM Orders WHERE Year='2022')
+        INSERT INTO Archive SELECT * FROM recent JOIN Persons ON recent.ID = Persons.ID;"""
+    CREATEVIEW = "CREATE VIEW Adults AS SELECT Name FROM (SELECT Name, Age FROM Persons) sub;"
+
+    SCRIPT = """
+        INSERT INTO stage SELECT * FROM raw;
+        INSERT INTO report SELECT * FROM stage JOIN dim ON stage.id = dim.id;
+        SELECT * FROM report;
+    """
+
+class TestSQLLineage(unittest.TestCase):
+
+    def test_insertselectjoin(self):
+        lineage = getlineage(SampleLineage.INSERTSELECTJOIN)
+
+        self.assertEqual(lineage.targets, ("sales.report",))
+        self.assertEqual(lineage.sources, ("limits", "persons", "sales.orders"))
+        self.assertEqual(lineage.aliases, {"p": "persons", "o": "sales.orders"})
+
+    def test_aliascteandsubquery(self):
+        self.assertEqual(getlineage(SampleLineage.UPDATEALIAS).targets, ("persons",))
+        self.assertEqual(getlineage(SampleLineage.WITHCTE).sources, ("orders", "persons"))
+        self.assertEqual(getlineage(SampleLineage.CREATEVIEW)[:2], (("adults",), ("persons",)))
+        self.assertEqual(getlineage("INSERT INTO a SELECT * FROM b x JOIN c b ON 1=1;").sources, ("b", "c"))
+        self.assertEqual(getlineage("DELETE b FROM c b JOIN b x ON 1=1;")[:2], (("c",), ("b", "c")))
+
+    def test_script(self):
+        lineages = getscriptlineage(SampleLineage.SCRIPT)
+
+        self.assertEqual([(lineage.targets, lineage.sources) for lineage in lineages], [
+            (("stage",), ("raw",)), (("report",), ("dim", "stage")), ((), ("report",))])
+
+class TestSQLLineageGraph(unittest.TestCase):
+
+    def test_graph(self):
+        graph = SQLLineageGraph()
+        graph.consume_sql("load.sql", SampleLineage.SCRIPT)
+        graph.consume_sql("archive.sql", SampleLineage.WITHCTE)
+
+        self.assertEqual(graph.upstream("report"), {"stage", "dim"})
+        self.assertEqual(graph.upstream("REPORT", transitive=True), {"stage", "dim", "raw"})
+        self.assertEqual(graph.downstream("raw", transitive=True), {"stage", "report"})
+        self.assertEqual(graph.downstream("persons"), {"archive"})
+        self.assertEqual(graph.scripts("stage", "report"), {"load.sql"})
+
+    def test_incrementalupdate(self):
+        graph = SQLLineageGraph()
+        graph.consume_sql("a.sql", "INSERT INTO t SELECT * FROM s; INSERT INTO u SELECT * FROM t;")
+        graph.consume_sql("b.sql", "INSERT INTO t SELECT * FROM s;")
+
+        graph.consume_sql("a.sql", "INSERT INTO u SELECT * FROM v;")
+
+        self.assertEqual(graph.edges, {("s", "t"), ("v", "u")})
+        self.assertEqual(graph.scripts("s", "t"), {"b.sql"})
+        self.assertEqual(graph.upstream("u"), {"v"})
+        self.assertEqual(graph.downstream("t"), set())
+
+        graph.remove("b.sql")
+        graph.remove("a.sql")
+
+        self.assertEqual(graph.tables, set())
+        self.assertEqual((graph._downstream, graph._upstream, graph._edges), ({}, {}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
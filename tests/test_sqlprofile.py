@@ -0,0 +1,71 @@
+import io
+import unittest
+from src.sqlstatement.sqlprofile import SQLProfiler, sizebucket
+from src.sqlstatement.sql import SQLEntityFactory, SQLProcessor, SQLParseBudget, SQLBudgetError
+from src.sqlstatement import sql, sqlparseutils
+from tests.test_sql import SampleSQL
+
+class TestSQLProfiler(unittest.TestCase):
+
+    def test_restore(self):
+        originals = (sqlparseutils.iscolumnname, sql.parse, dict(SQLProcessor),
+            vars(SQLEntityFactory)["_SQLEntityFactory__map_sqltable"])
+
+        with SQLProfiler():
+            self.assertIsNot(sqlparseutils.iscolumnname, originals[0])
+            self.assertIsNot(SQLProcessor["SELECTFROM"], originals[2]["SELECTFROM"])
+
+        self.assertEqual((sqlparseutils.iscolumnname, sql.parse, dict(SQLProcessor),
+            vars(SQLEntityFactory)["_SQLEntityFactory__map_sqltable"]), originals)
+
+    def test_counts(self):
+        with SQLProfiler() as profiler:
+            sqlentity = SQLEntityFactory.create_entity(SampleSQL.SELECTFROM)
+            SQLEntityFactory.create_entity(SampleSQL.DELETEFROM)
+            SQLEntityFactory.create_entity(SampleSQL.DELETEFROM, fields={"name", "action"})
+
+        self.assertEqual(sqlentity, SQLEntityFactory.create_entity(SampleSQL.SELECTFROM))
+
+        size = sizebucket(len(SampleSQL.SELECTFROM))
+        tokens = len(list(sql.parse(SampleSQL.SELECTFROM)[0].flatten()))
+        self.assertEqual(profiler.statements[("SELECTFROM", size)][0], 1)
+        self.assertEqual(profiler.statements[("DELETEFROM", sizebucket(len(SampleSQL.DELETEFROM)))][0], 2)
+        self.assertEqual(profiler.functions[("SELECTFROM", size, "sqlparseutils.iscolumnname")][0], tokens)
+        self.assertEqual(profiler.functions[("SELECTFROM", size, "SQLEntityFactory.__map_sqltable")][0], 1)
+
+        rows = profiler.rows(bykind=False, bysize=False)
+        self.assertEqual((rows[0].kind, rows[0].function, rows[0].calls), ("*", "SQLEntityFactory.create_entity", 3))
+        self.assertAlmostEqual(rows[0].share, 1.0)
+
+    def test_exception(self):
+        with SQLProfiler() as profiler:
+            self.assertRaises(SQLBudgetError, SQLEntityFactory.create_entity, SampleSQL.UPDATEMULTI,
+                budget=SQLParseBudget(maxtokens=5))
+            SQLEntityFactory.create_entity(SampleSQL.UPDATEONE)
+
+        self.assertEqual({kind for kind, _ in profiler.statements}, {"UPDATE"})
+        self.assertEqual(sum(count for count, _ in profiler.statements.values()), 2)
+        self.assertEqual(profiler._stack, [])
+
+    def test_export(self):
+        with SQLProfiler() as profiler:
+            for _ in range(20):
+                SQLEntityFactory.create_entity(SampleSQL.INSERTINTOWCOLS)
+
+        out = io.StringIO()
+        profiler.write_collapsed(out)
+        lines = out.getvalue().splitlines()
+
+        self.assertTrue(lines)
+        for line in lines:
+            stack, weight = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("INSERTINTO;<=256B;SQLEntityFactory.create_entity"))
+            self.assertGreater(int(weight), 0)
+
+        summary = profiler.format_summary(limit=5)
+        self.assertIn("INSERTINTO", summary)
+        self.assertEqual(len(summary.splitlines()), 1 + 1 + 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
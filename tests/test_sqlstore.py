@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+from src.sqlstatement.sqlstore import SQLStoreWriter, SQLStoreReader, encode_value, decode_value
+from src.sqlstatement.sql import SQLEntityFactory
+from src.sqlstatement.sqlactions import SQLDDLAction, SQLDMLAction
+from tests.test_sql import SampleSQL
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestSQLStore(unittest.TestCase):
+
+    STATEMENTS = [SampleSQL.CREATEDB, SampleSQL.CREATETABLE, SampleSQL.ADDPRIMARYKEY, SampleSQL.INSERTINTOWCOLS,
+        SampleSQL.UPDATEMULTI, SampleSQL.SELECTFROM, SampleSQL.DELETEFROM, SampleSQL.DROPCONSTRAINT]
+
+    def setUp(self):
+        descriptor, self.path = tempfile.mkstemp(suffix=".sqlstore")
+        os.close(descriptor)
+
+        self.entities = [SQLEntityFactory.create_entity(sql) for sql in self.STATEMENTS]
+        self.entities.append(SQLEntityFactory.create_entity(SampleSQL.INSERTTYPED, typed=True))
+        self.entities.append(SQLEntityFactory.create_entity(SampleSQL.DELETEFROM, fields={"name", "action"}))
+
+        with SQLStoreWriter(self.path) as writer:
+            for entity in self.entities:
+                writer.write(entity)
+            writer.write_sql(["NOT A STATEMENT"])
+
+        self.assertEqual((writer.statements, writer.errors), (len(self.entities), 1))
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_values(self):
+        for value in [None, "it's", 1, True, 1.5, [Decimal("10.5"), date(2022, 5, 1)], [["a", None], [1, 2]]]:
+            self.assertEqual(decode_value(encode_value(value)), value)
+
+    def test_roundtrip(self):
+        with SQLStoreReader(self.path, usenumpy=False) as reader:
+            self.assertEqual(len(reader), len(self.entities))
+            self.assertEqual(list(reader.entities()), self.entities)
+
+    def assert_select(self, reader: SQLStoreReader):
+        names = [entity.name for entity in self.entities]
+
+        self.assertEqual(list(reader.select(action=SQLDMLAction.DELETE)), [6, 9])
+        self.assertEqual(list(reader.select(table="Customers", action=SQLDMLAction.DELETE)), [6, 9])
+        self.assertEqual(list(reader.select(table="Persons")), [i for i, name in enumerate(names) if name == "Persons"])
+        self.assertEqual(list(reader.select(column="LastName", action=SQLDDLAction.ADDCONSTRAINT)), [2])
+        self.assertEqual(list(reader.select(wherecolumn="Country")), [4, 5])
+        self.assertEqual(list(reader.select(table="Unknown")), [])
+
+        position, = reader.select(wherecolumn="CustomerName")
+        self.assertEqual(reader[int(position)], self.entities[6])
+
+    def test_select(self):
+        with SQLStoreReader(self.path, usenumpy=False) as reader:
+            self.assert_select(reader)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_selectnumpy(self):
+        with SQLStoreReader(self.path) as reader:
+            self.assertIsInstance(reader.sections["action"], numpy.ndarray)
+            self.assert_select(reader)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_closeexported(self):
+        with SQLStoreReader(self.path) as reader:
+            actions = reader.sections["action"]
+            expected = actions.copy()
+
+        self.assertEqual(reader.sections, {})
+        self.assertTrue((actions == expected).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
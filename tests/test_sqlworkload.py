@@ -0,0 +1,42 @@
+import unittest
+from src.sqlstatement.sqlworkload import (SQLWorkloadGenerator, SQLWorkloadConfig, SQLWorkloadHarness,
+    percentile)
+
+class TestSQLWorkload(unittest.TestCase):
+
+    def test_generatorseeded(self):
+        first = list(SQLWorkloadGenerator(SQLWorkloadConfig(seed=7)).generate(50))
+        second = list(SQLWorkloadGenerator(SQLWorkloadConfig(seed=7)).generate(50))
+
+        self.assertEqual(first, second)
+
+    def test_generatorallkinds(self):
+        config = SQLWorkloadConfig(seed=1)
+        for kind in config.kinds:
+            generator = SQLWorkloadGenerator(config._replace(kinds={kind: 1}, wheredepth=(1, 3), rows=(1, 3)))
+            report = SQLWorkloadHarness(interval=5).run(generator.generate(10))
+
+            self.assertEqual(report.errors, 0, kind)
+
+    def test_unsupportedkind(self):
+        self.assertRaises(ValueError, SQLWorkloadGenerator, SQLWorkloadConfig(kinds={"MERGE": 1}))
+
+    def test_harnessreport(self):
+        statements = list(SQLWorkloadGenerator(SQLWorkloadConfig(seed=3)).generate(20))
+        report = SQLWorkloadHarness(interval=10).run(statements)
+
+        self.assertEqual(report.statements, 20)
+        self.assertEqual(report.bytes, sum(len(sql.encode()) for sql in statements))
+        self.assertEqual(sum(report.latencies.values()), 20)
+        self.assertEqual(len(report.samples), 2)
+        self.assertGreater(report.samples[-1].rss, 0)
+        self.assertIsNotNone(percentile(report.latencies, 0.99))
+
+    def test_harnessbytes(self):
+        report = SQLWorkloadHarness().run(["SELECT Name FROM Customers WHERE City='Tromsø';"])
+
+        self.assertEqual(report.bytes, len("SELECT Name FROM Customers WHERE City='Tromsø';") + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()